@@ -0,0 +1,457 @@
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+import metadata
+
+BENCHMARK_SCHEMA_VERSION = 1
+PHASES = ["walk", "extraction", "join_maps", "config_sample", "readme_splice"]
+SYNTHETIC_README = "# Synthetic Plugin\n\n<!-- START Join Maps -->\n<!-- END Join Maps -->\n"
+
+def generate_device_file(index, feedback_count, commented_lines=0):
+    lines = [
+        "using System;",
+        "using PepperDash.Essentials.Core;",
+        "",
+        "namespace Synthetic.Plugin",
+        "{",
+        f"    /// <summary>Synthetic device {index}</summary>",
+        f"    public class Device{index} : EssentialsBridgeableDevice, IHasPowerControl, ICommunicationMonitor",
+        "    {",
+    ]
+    feedback_types = ["BoolFeedback", "IntFeedback", "StringFeedback"]
+    for feedback in range(feedback_count):
+        feedback_type = feedback_types[feedback % 3]
+        lines.append(f"        public {feedback_type} Feedback{feedback} {{ get; private set; }}")
+    # Commented-out code, half in line comments and half in a block comment;
+    # lexing blanks it, which is where whitespace-anchored patterns slow down
+    lines.extend(f"        // public int Retired{line} {{ get; set; }}" for line in range(commented_lines // 2))
+    if commented_lines > 1:
+        lines.append("        /*")
+        lines.extend(f"        public void Retired{line}() {{ }}" for line in range(commented_lines - commented_lines // 2))
+        lines.append("        */")
+    lines.extend([
+        f"        public Device{index}(string key, string name, DeviceConfig config) : base(key, name)",
+        "        {",
+        "            // Feedbacks are created in Initialize()",
+        "        }",
+        "",
+        "        public void PowerOn() { SendText(\"PWR ON\\r\"); }",
+        "        public void PowerOff() { SendText(\"PWR OFF\\r\"); }",
+        "        public string GetStatus(int id) { return $\"{{status}} {id}\"; }",
+        "        private void SendText(string text) { }",
+        "    }",
+        "}",
+    ])
+    return "\n".join(lines) + "\n"
+
+def generate_factory_file(index):
+    return (
+        "namespace Synthetic.Plugin\n"
+        "{\n"
+        f"    public class Device{index}Factory : EssentialsPluginDeviceFactory<Device{index}>\n"
+        "    {\n"
+        f"        public Device{index}Factory()\n"
+        "        {\n"
+        "            MinimumEssentialsFrameworkVersion = \"2.0.0\";\n"
+        f"            TypeNames = new List<string>() {{ \"device{index}\", \"device{index}alt\" }};\n"
+        "        }\n"
+        "    }\n"
+        "}\n"
+    )
+
+# The IBasicCommunicationJoinMap layout: each number is shared by a join
+# SIMPL drives and one it reads, which join validation must accept.
+COMMUNICATION_JOINS = [
+    ("Connect", "Digital", "FromSIMPL"),
+    ("Connected", "Digital", "ToSIMPL"),
+    ("SendText", "Serial", "FromSIMPL"),
+    ("TextReceived", "Serial", "ToSIMPL"),
+]
+
+def generate_joinmap_file(index, join_count):
+    join_types = ["Digital", "Analog", "Serial"]
+    lines = [
+        "namespace Synthetic.Plugin",
+        "{",
+        f"    public class Device{index}JoinMap : JoinMapBaseAdvanced",
+        "    {",
+    ]
+    for name, join_type, capabilities in COMMUNICATION_JOINS:
+        lines.extend([
+            f"        [JoinName(\"{name}\")]",
+            f"        public JoinDataComplete {name} = new JoinDataComplete(",
+            "            new JoinData { JoinNumber = 1, JoinSpan = 1 },",
+            f"            new JoinMetadata {{ Description = \"{name}\", "
+            f"JoinCapabilities = eJoinCapabilities.{capabilities}, JoinType = eJoinType.{join_type} }});",
+            "",
+        ])
+    for join in range(join_count):
+        lines.extend([
+            f"        [JoinName(\"Join{join}\")]",
+            f"        public JoinDataComplete Join{join} = new JoinDataComplete(",
+            f"            new JoinData {{ JoinNumber = {join // 3 + 2}, JoinSpan = 1 }},",
+            f"            new JoinMetadata {{ Description = \"Join {join} of map {index}\", "
+            f"JoinCapabilities = eJoinCapabilities.ToSIMPL, JoinType = eJoinType.{join_types[join % 3]} }});",
+            "",
+        ])
+    lines.extend([
+        f"        public Device{index}JoinMap(uint joinStart) : base(joinStart, typeof(Device{index}JoinMap)) {{ }}",
+        "    }",
+        "}",
+    ])
+    return "\n".join(lines) + "\n"
+
+def generate_config_file(depth, breadth):
+    """
+    Generates a config class graph: the root config holds breadth nested
+    configs, each nesting further down to depth levels, with lists and
+    dictionaries of the next level.
+    """
+    lines = ["namespace Synthetic.Plugin", "{"]
+    for level in range(depth):
+        class_name = "SyntheticConfig" if level == 0 else f"Level{level}Config"
+        next_class = f"Level{level + 1}Config"
+        lines.append(f"    public class {class_name}")
+        lines.append("    {")
+        lines.append("        [JsonProperty(\"name\")]")
+        lines.append("        public string Name { get; set; }")
+        lines.append("        [JsonProperty(\"enabled\")]")
+        lines.append("        public bool Enabled { get; set; }")
+        if level + 1 < depth:
+            for child in range(breadth):
+                container = ["{0}", "List<{0}>", "Dictionary<string, {0}>"][child % 3].format(next_class)
+                lines.append(f"        [JsonProperty(\"child{child}\")]")
+                lines.append(f"        public {container} Child{child} {{ get; set; }}")
+        lines.append("    }")
+        lines.append("")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def generate_helper_file(index):
+    return (
+        "namespace Synthetic.Plugin.Helpers\n"
+        "{\n"
+        f"    internal static class Helper{index}\n"
+        "    {\n"
+        "        internal static int Clamp(int value) { return value < 0 ? 0 : value; }\n"
+        "    }\n"
+        "}\n"
+    )
+
+def generate_corpus(root, files, joinmaps, joins, config_depth, config_breadth, feedbacks, commented_lines):
+    """
+    Writes a synthetic Essentials plugin tree under root with `files` C#
+    files in total: joinmaps join map classes of `joins` joins each after
+    the COMMUNICATION_JOINS, one config class graph, and device, factory
+    and helper files. Device files carry commented_lines lines of
+    commented-out code.
+    """
+    written = 0
+
+    def write(relative_path, content):
+        nonlocal written
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        written += 1
+
+    write("src/Config/SyntheticConfig.cs", generate_config_file(config_depth, config_breadth))
+    for index in range(joinmaps):
+        write(f"src/JoinMaps/Device{index}JoinMap.cs", generate_joinmap_file(index, joins))
+    index = 0
+    while written < files:
+        folder = f"src/Devices/Group{index // 50}"
+        kind = index % 4
+        if kind == 0:
+            write(f"{folder}/Device{index}.cs", generate_device_file(index, feedbacks, commented_lines))
+        elif kind == 1:
+            write(f"{folder}/Device{index}Factory.cs", generate_factory_file(index))
+        else:
+            write(f"src/Helpers/Group{index // 50}/Helper{index}.cs", generate_helper_file(index))
+        index += 1
+    reset_readme(root)
+    return written
+
+class PhaseRecorder:
+    """
+    Times named phases and, when trace_memory is set, records the peak
+    memory allocated during each one with tracemalloc.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.seconds = {}
+        self.peak_bytes = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        self.seconds[name] = time.perf_counter() - start
+        if self.trace_memory:
+            self.peak_bytes[name] = tracemalloc.get_traced_memory()[1]
+
+def run_phases(directory, jobs, recorder):
+    """
+    Runs the metadata pipeline over directory one phase at a time,
+    recording each phase in recorder. Returns the phase outputs.
+    """
+    with recorder.phase("walk"):
+        file_paths = metadata.find_source_files(directory)
+
+    with recorder.phase("extraction"):
+        records = metadata.load_file_records(directory, file_paths, None, jobs)
+        scan = metadata.merge_file_records(file_paths, records)
+
+    # Join entries are extracted with every file; re-parse the join map
+    # files on their own so the join map parser is measured in isolation.
+    with recorder.phase("join_maps"):
+        joinmap_classes = set(metadata.find_joinmap_classes(scan["class_defs"]))
+        for file_path in file_paths:
+            if os.path.basename(file_path)[:-3] in joinmap_classes:
+                metadata.extract_joinmap_entries(metadata.read_source_file(file_path))
+        model = metadata.build_metadata_model(scan)
+
+    with recorder.phase("config_sample"):
+        metadata.generate_sample_config("SyntheticConfig", model["class_properties"], model["supported_types"])
+
+    with recorder.phase("readme_splice"):
+        sections, _ = metadata.build_readme_sections(model)
+        readme_path = os.path.join(directory, "README.md")
+        readme_content = metadata.splice_readme_sections(metadata.read_readme_file(readme_path), sections)
+        metadata.write_file_if_changed(readme_path, readme_content)
+
+    return {"files": len(file_paths), "joins": len(model["joins"]), "join_errors": metadata.count_join_errors(model)}
+
+def measure_file_peaks(directory):
+    """
+    Reads and extracts every file the way an extraction worker does, with
+    tracemalloc running, and summarizes the peak memory of each file.
+    """
+    file_paths = metadata.find_source_files(directory)
+    extracted = metadata.extract_file_chunk(list(enumerate(file_paths)), trace_memory=True)
+    peaks = {file_paths[item[0]]: item[5] for item in extracted}
+    largest = max(peaks, key=peaks.get)
+    return {
+        "max_bytes": peaks[largest],
+        "mean_bytes": round(sum(peaks.values()) / len(peaks)),
+        "largest_file": os.path.relpath(largest, directory).replace(os.sep, '/'),
+        "largest_file_size": os.path.getsize(largest),
+    }
+
+def measure_record_memory(directory):
+    """
+    Measures the memory the per-file records of the tree keep alive, as
+    held by the pipeline, and the same records held as plain dicts with
+    their own copies of every string, the way they are written to JSON.
+    """
+    def retained(build):
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        data = build()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, data
+
+    file_paths = metadata.find_source_files(directory)
+    records_bytes, records = retained(lambda: metadata.load_file_records(directory, file_paths, None, 1))
+    as_dicts = [
+        dict(
+            record,
+            joins=[join._asdict() for join in record["joins"]],
+            class_properties=[
+                (class_name, [prop._asdict() for prop in properties])
+                for class_name, properties in record["class_properties"]
+            ],
+            class_members=[
+                (class_name, [member._asdict() for member in members])
+                for class_name, members in record["class_members"]
+            ]
+        )
+        for record in records
+    ]
+    dict_bytes, _ = retained(lambda: json.loads(json.dumps(as_dicts)))
+    return {"records_bytes": records_bytes, "dict_bytes": dict_bytes}
+
+def reset_readme(directory):
+    # Each run starts from the untouched README so the splice always writes
+    with open(os.path.join(directory, "README.md"), 'w', encoding='utf-8') as f:
+        f.write(SYNTHETIC_README)
+
+def max_rss_bytes():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+def run_benchmark(args):
+    corpus = {
+        "files": args.files,
+        "joinmaps": args.joinmaps,
+        "joins": args.joins,
+        "config_depth": args.config_depth,
+        "config_breadth": args.config_breadth,
+        "feedbacks": args.feedbacks,
+        "commented_lines": args.commented_lines,
+    }
+    work_directory = tempfile.mkdtemp(prefix="metadata-benchmark-")
+    try:
+        generate_corpus(work_directory, **corpus)
+        runs = []
+        for _ in range(args.repeat):
+            reset_readme(work_directory)
+            recorder = PhaseRecorder()
+            outputs = run_phases(work_directory, args.jobs, recorder)
+            runs.append(recorder.seconds)
+        peaks = {}
+        file_peaks = None
+        record_memory = None
+        if not args.no_memory:
+            # A separate pass, since tracing allocations slows every phase down
+            reset_readme(work_directory)
+            recorder = PhaseRecorder(trace_memory=True)
+            tracemalloc.start()
+            try:
+                run_phases(work_directory, args.jobs, recorder)
+                file_peaks = measure_file_peaks(work_directory)
+                record_memory = measure_record_memory(work_directory)
+            finally:
+                tracemalloc.stop()
+            peaks = recorder.peak_bytes
+    finally:
+        if args.keep_corpus:
+            logging.info("Corpus kept at %s", work_directory)
+        else:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+    phases = {}
+    for phase in PHASES:
+        # The fastest run is the least disturbed by other load on the machine
+        seconds = min(run[phase] for run in runs)
+        phases[phase] = {"seconds": round(seconds, 6), "peak_bytes": peaks.get(phase)}
+    total_seconds = sum(phase["seconds"] for phase in phases.values())
+    return {
+        "schema": BENCHMARK_SCHEMA_VERSION,
+        "corpus": corpus,
+        "jobs": args.jobs,
+        "repeat": args.repeat,
+        "files": outputs["files"],
+        "joins": outputs["joins"],
+        "join_errors": outputs["join_errors"],
+        "phases": phases,
+        "total_seconds": round(total_seconds, 6),
+        "files_per_second": round(outputs["files"] / phases["extraction"]["seconds"], 1) if phases["extraction"]["seconds"] else None,
+        "max_rss_bytes": max_rss_bytes(),
+        "file_peak": file_peaks,
+        "record_memory": record_memory,
+    }
+
+def compare_with_baseline(result, baseline, tolerance, min_delta=0.005):
+    """
+    Compares phase timings with a stored baseline result.
+    Returns the phases slower than the baseline by more than tolerance
+    (a fraction, e.g. 0.25 for 25%) and by more than min_delta seconds,
+    so millisecond phases do not fail on timer noise.
+    """
+    regressions = []
+    for phase, current in result["phases"].items():
+        previous = baseline.get("phases", {}).get(phase)
+        if not previous or not previous.get("seconds"):
+            continue
+        ratio = current["seconds"] / previous["seconds"]
+        current["baseline_ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance and current["seconds"] - previous["seconds"] > min_delta:
+            regressions.append(phase)
+    if baseline.get("corpus") != result["corpus"]:
+        logging.warning("Baseline was measured on a different corpus; ratios are not comparable.")
+    return regressions
+
+def format_table(result):
+    lines = [f"{'Phase':<16}{'Seconds':>12}{'Peak MiB':>12}{'vs baseline':>14}"]
+    for phase, values in result["phases"].items():
+        peak = values.get("peak_bytes")
+        peak_text = f"{peak / (1024 * 1024):.2f}" if peak is not None else "-"
+        ratio = values.get("baseline_ratio")
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else "-"
+        lines.append(f"{phase:<16}{values['seconds']:>12.4f}{peak_text:>12}{ratio_text:>14}")
+    lines.append(f"{result['files']} files, {result['files_per_second']} files/sec extracted, "
+                 f"{result['total_seconds']:.4f}s total")
+    file_peak = result.get("file_peak")
+    if file_peak:
+        lines.append(f"Per-file peak: {file_peak['max_bytes'] / (1024 * 1024):.2f} MiB max "
+                     f"({file_peak['largest_file']}, {file_peak['largest_file_size'] / 1024:.0f} KiB), "
+                     f"{file_peak['mean_bytes'] / (1024 * 1024):.2f} MiB mean")
+    record_memory = result.get("record_memory")
+    if record_memory:
+        saved = 1 - record_memory["records_bytes"] / record_memory["dict_bytes"]
+        lines.append(f"Records held: {record_memory['records_bytes'] / (1024 * 1024):.2f} MiB, "
+                     f"{record_memory['dict_bytes'] / (1024 * 1024):.2f} MiB as plain dicts ({saved:.0%} saved)")
+    return "\n".join(lines)
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark metadata.py on a synthetic Essentials plugin tree.")
+    parser.add_argument("--files", type=int, default=500, help="Total number of C# files (default: 500).")
+    parser.add_argument("--joinmaps", type=int, default=20, help="Number of JoinMapBaseAdvanced classes (default: 20).")
+    parser.add_argument("--joins", type=int, default=50, help="Joins per join map (default: 50).")
+    parser.add_argument("--config-depth", type=int, default=5, help="Depth of the config class graph (default: 5).")
+    parser.add_argument("--config-breadth", type=int, default=3, help="Nested configs per config class (default: 3).")
+    parser.add_argument("--feedbacks", type=int, default=30, help="Feedbacks per device file (default: 30).")
+    parser.add_argument("--commented-lines", type=int, default=200,
+                        help="Lines of commented-out code per device file (default: 200).")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Extraction processes, as metadata.py --jobs (default: 1).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs; the fastest is reported (default: 3).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory pass.")
+    parser.add_argument("--keep-corpus", action="store_true", help="Keep the generated tree for inspection.")
+    parser.add_argument("--output", help="Write the JSON result to this file instead of stdout.")
+    parser.add_argument("--baseline", help="JSON result of an earlier run to compare phase timings with.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline before failing (default: 0.25).")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Seconds a phase must also slow down by before failing (default: 0.005).")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    # Keep the pipeline's own INFO chatter out of the measurements
+    metadata.configure_logging("WARNING")
+    # Measure every file, however slow, instead of skipping it
+    metadata.FILE_TIME_BUDGET = 0
+
+    result = run_benchmark(args)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(result, json.load(f), args.tolerance, args.min_delta)
+        result["regressions"] = regressions
+
+    print(format_table(result), file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=4)
+    else:
+        print(json.dumps(result, indent=4))
+    if result["join_errors"]:
+        # The synthetic join maps are valid, so any error is a validation bug
+        print(f"Join validation reported {result['join_errors']} errors on the synthetic corpus", file=sys.stderr)
+    if regressions:
+        print(f"Regressed phases: {', '.join(regressions)}", file=sys.stderr)
+    if regressions or result["join_errors"]:
+        sys.exit(1)
@@ -1,304 +1,1428 @@
 import os
 import re
+import sys
 import json
+import mmap
+import ctypes
+import select
+import hashlib
 import logging
+import signal
+import tempfile
+import threading
+import fnmatch
+import functools
+import itertools
+import collections
+import tracemalloc
+import contextlib
+import cProfile
+import argparse
+import subprocess
+import concurrent.futures
+from time import perf_counter, process_time, sleep
 
-# Set up logging configuration
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured by configure_logging() when run as a script; the
+# level comes from --log-level or $METADATA_LOG_LEVEL and defaults to INFO.
+LOG_LEVEL_ENV = "METADATA_LOG_LEVEL"
+DEFAULT_LOG_LEVEL = "INFO"
+
+# Bump EXTRACTOR_VERSION whenever an extractor changes what it returns, so
+# cached per-file records produced by the old code are not reused.
+EXTRACTOR_VERSION = 10
+CACHE_SCHEMA_VERSION = 2
+CACHE_FILENAME = "extraction-cache.json"
+# Version of the aggregated metadata model written by --snapshot and --format
+MODEL_SCHEMA_VERSION = 5
+
+# Bump README_FORMAT_VERSION whenever a README section renders differently
+# from the same model, so the hashes in existing START markers stop matching.
+README_FORMAT_VERSION = 1
+
+# Set by --profile; collects phase and extractor timings while it is not None.
+PROFILER = None
+
+# Default for --file-time-budget: seconds a single file may spend in the
+# extractors before it is skipped with a warning (0 disables the budget).
+FILE_TIME_BUDGET = 10.0
+
+# Limits of the generated config example: nested config classes expanded
+# below the main config class, and values generated in total.
+SAMPLE_MAX_DEPTH = 12
+SAMPLE_MAX_VALUES = 5000
+
+# Never scanned: build output, restored NuGet packages and git metadata.
+# Each glob is matched against the name and the project-relative path of
+# every directory and file; --ignore adds more.
+IGNORE_GLOBS = ["bin", "obj", "packages", ".git"]
+
+# --watch: how often to poll for changes without inotify, and how long the
+# tree must stay unchanged after a change before README.md is re-rendered.
+WATCH_POLL_INTERVAL = 0.5
+WATCH_DEBOUNCE = 0.05
+
+# Files of at least MMAP_THRESHOLD bytes are read through a memory map;
+# smaller ones with a plain read, which releases the GIL while it waits.
+MMAP_THRESHOLD = 1024 * 1024
+# Threads reading files ahead of extraction (0 reads inline, see --io-threads)
+# and the most files read but not yet extracted, which caps their memory.
+IO_THREADS = 8
+PREFETCH_DEPTH = 32
+
+# Below this many files to extract, a process pool costs more than it saves.
+PARALLEL_FILE_THRESHOLD = 64
+PARALLEL_CHUNK_SIZE = 32
+
+# Compiled once at import and shared by every extractor.
+# Patterns that may run over a whole file avoid nested or overlapping
+# quantifiers, so a failed match at one position never rescans the rest of
+# the file and extraction stays linear on large or malformed sources.
+# MULTILINE patterns anchor with ^[ \t]* rather than ^\s*: lexing turns
+# comments into runs of blank lines, and ^\s* would rescan the rest of
+# such a run from every line start inside it.
+PATTERNS = {
+    # Comments, string and char literals, and braces. Everything between these
+    # tokens is plain code, so a single finditer pass tokenizes a whole file.
+    "csharp_token": re.compile(
+        r'(?P<line_comment>//[^\n]*)'
+        r'|(?P<block_comment>/\*.*?(?:\*/|\Z))'
+        r'|(?P<verbatim_string>(?:\$@|@\$|@)"(?:[^"]|"")*"?)'
+        r'|(?P<string>\$?"(?:[^"\\\n]|\\.)*"?)'
+        r'|(?P<char>\'(?:[^\'\\\n]|\\.)*\'?)'
+        r'|(?P<open_brace>\{)'
+        r'|(?P<close_brace>\})',
+        re.DOTALL
+    ),
+    "non_newline": re.compile(r'[^\n]'),
+    "inheritance": re.compile(r'class\s+\w+(?:\s*<[^<>{};]*>)?\s*:\s*([^{]+)'),
+    # Starts the generic constraints that may follow a base list
+    "generic_constraint": re.compile(r'\swhere\s'),
+    "type_names": re.compile(r'TypeNames\s*=\s*new\s*List<string>\(\)\s*{([^}]+)}'),
+    "minimum_version": re.compile(r'^[ \t]*MinimumEssentialsFrameworkVersion\s*=\s*"([^"]+)"\s*;', re.MULTILINE),
+    # Any public member declaration; the tail tells methods, properties
+    # and fields apart, and a method's parameters run to the matching ')'
+    "member": re.compile(
+        r'(?<![\w.])public\s+'
+        r'(?P<modifiers>(?:(?:static|virtual|override|abstract|sealed|async|new|extern|unsafe|readonly|required)\s+)*)'
+        r'(?:(?P<event>event)\s+)?'
+        r'(?P<type>(?:[A-Za-z_][\w.]*'                                              # Type name
+        r'(?:\s*<(?:[^<>;{}()=]|<(?:[^<>;{}()=]|<[^<>;{}()=]*>)*>)*>)?'             # Generic arguments
+        r'|\((?:[^()<>;{}=]|<[^<>;{}()=]*>)*\))'                                     # or a tuple
+        r'(?:\s*\[[\s,]*\])*\??)'                                                  # Arrays, nullable
+        r'\s+(?P<name>[A-Za-z_]\w*)'                                                # Member name
+        r'(?P<type_parameters>\s*<[^<>(){};=]*>)?'                                  # Method type parameters
+        r'\s*(?P<tail>\(|\{|=>|=|;)'
+    ),
+    # What can end a parameter list: its ')', or a token no parameter list holds
+    "parameter_token": re.compile(r'[(){};]'),
+    "signature_open_space": re.compile(r'([(<\[])\s+'),
+    "signature_close_space": re.compile(r'\s+([)>\],])'),
+    "signature_comma": re.compile(r',(?=\S)'),
+    # A class header only: its base list runs to the next '{' (or ';',
+    # which rules the header out), found by CSharpSource.class_declarations
+    # with a search that never goes back over text it has already passed.
+    "class_declaration": re.compile(
+        r'^[ \t]*(?:\[[^\]\n]+\][ \t]*)*'  # Optional attributes on the same line
+        r'(?:(?:public|private|protected|internal|abstract|sealed|static|partial|new|unsafe)\s+)*'  # Optional modifiers
+        r'class\s+([A-Za-z_]\w*)'         # Class name
+        r'(?:\s*<[^<>{};]*>)?',           # Optional type parameters
+        re.MULTILINE
+    ),
+    "class_declaration_end": re.compile(r'[{;]'),
+    "property": re.compile(
+        r'^[ \t]*'
+        r'(?:\[[^\]{};\n]*\]\s*)*'         # Optional attributes, each on one line
+        r'(?:public|private|protected)\s+'  # Access modifier
+        r'(?:static\s+|virtual\s+|override\s+|abstract\s+|readonly\s+)?'  # Optional modifiers
+        r'([A-Za-z0-9_<>,\[\]\?]+(?:[ \t]+[A-Za-z0-9_<>,\[\]\?]+)*?)\s+'  # Type, words on one line
+        r'([A-Za-z_]\w*)\s*'                # Property name
+        r'\{[^}]*\}',                       # Property body
+        re.MULTILINE
+    ),
+    "json_property": re.compile(r'\[JsonProperty\("([^"]+)"\)\]'),
+    # Handles multiline definitions and optional parameters. The parameters
+    # run from the end of this match to the next join_end, which
+    # extract_joinmap_entries finds with a separate search.
+    "join": re.compile(
+        r'\[JoinName\("(?P<join_name>[^"]+)"\)\]\s*'                  # [JoinName("...")]
+        r'public\s+JoinDataComplete\s+(?P<property_name>\w+)\s*=\s*'   # public JoinDataComplete PropertyName =
+        r'new\s+JoinDataComplete\s*\(\s*'                             # new JoinDataComplete(
+    ),
+    "join_end": re.compile(r'\)\s*;'),
+    "join_data": re.compile(r'new\s+JoinData\s*(?:\(\s*\))?\s*\{(.*?)\}', re.DOTALL),
+    "join_metadata": re.compile(r'new\s+JoinMetadata\s*(?:\(\s*\))?\s*\{(.*?)\}', re.DOTALL),
+    "join_number": re.compile(r'JoinNumber\s*=\s*(\d+)'),
+    "join_span": re.compile(r'JoinSpan\s*=\s*(\d+)'),
+    "join_description": re.compile(r'Description\s*=\s*"([^"]+)"'),
+    "join_type": re.compile(r'JoinType\s*=\s*eJoinType\.(\w+)'),
+    "join_capabilities": re.compile(r'JoinCapabilities\s*=\s*eJoinCapabilities\.(\w+)'),
+}
+
+# Extracted items are kept as tuples rather than dicts: a tree or batch
+# holds many of them and a dict per item costs several times the memory.
+# They become dicts only where they are written out as JSON.
+ClassProperty = collections.namedtuple("ClassProperty", ["json_property_name", "property_name", "property_type"])
+ClassMember = collections.namedtuple("ClassMember", ["kind", "name", "type", "signature"])
+JoinEntry = collections.namedtuple(
+    "JoinEntry", ["name", "property", "class_name", "join_number", "join_span", "type", "capabilities", "description"]
+)
+# start is the offset of the declaration, body_start the offset just past its
+# '{' and end that of the matching '}'; bases is the raw base list or None.
+ClassDeclaration = collections.namedtuple("ClassDeclaration", ["name", "bases", "start", "body_start", "end"])
+
+class CSharpSource:
+    """
+    A C# file after a single lexing pass.
+    code is the original text with every comment blanked out (newlines are
+    kept, so offsets and line numbers match the original text) and
+    brace_matches maps the index of each code '{' to its matching '}'.
+    Braces inside strings, chars and comments are ignored.
+    literal_spans holds the (start, end) offsets of every string and char
+    literal, in file order.
+    """
+
+    def __init__(self, text, code, brace_matches, literal_spans=()):
+        self.text = text
+        self.code = code
+        self.brace_matches = brace_matches
+        self.literal_spans = literal_spans
+        self._class_declarations = None
+        self._literal_free_code = None
+
+    def literal_free_code(self):
+        """
+        Returns code with string and char literals blanked out as well, so
+        a parenthesis or brace in a literal is not taken for code. Offsets
+        still match the original text. Built on the first call.
+        """
+        if self._literal_free_code is None:
+            pieces = []
+            last_end = 0
+            for start, end in self.literal_spans:
+                pieces.append(self.code[last_end:start])
+                pieces.append(PATTERNS["non_newline"].sub(' ', self.code[start:end]))
+                last_end = end
+            pieces.append(self.code[last_end:])
+            self._literal_free_code = ''.join(pieces)
+        return self._literal_free_code
+
+    def class_declarations(self):
+        """
+        Returns a ClassDeclaration for every class of the file, in file
+        order. They are found on the first call and shared by every
+        extractor after it.
+        """
+        if self._class_declarations is None:
+            self._class_declarations = find_class_declarations(self.code, self.brace_matches)
+        return self._class_declarations
+
+def find_class_declarations(code, brace_matches):
+    declarations = []
+    terminator = None
+    body_start = 0
+    for match in PATTERNS["class_declaration"].finditer(code):
+        # A header inside the base list of the previous class is not a class
+        if match.start() < body_start:
+            continue
+        # Headers come in file order, so the '{' or ';' ending one is reused
+        # for the headers before it instead of searched for again
+        if terminator is None or terminator.start() < match.end():
+            terminator = PATTERNS["class_declaration_end"].search(code, match.end())
+            if terminator is None:
+                break
+        if terminator.group() != '{':
+            continue
+        bases = code[match.end():terminator.start()].strip()
+        if bases and not bases.startswith(':'):
+            continue
+        body_start = terminator.end()
+        declarations.append(ClassDeclaration(match.group(1), bases[1:] or None, match.start(), body_start,
+                                             brace_matches.get(terminator.start(), len(code))))
+    return declarations
+
+def lex_csharp(file_content):
+    """
+    Lexes file_content into a CSharpSource. Passing a CSharpSource returns it
+    unchanged, so extractors accept either raw text or an already lexed file.
+    """
+    if isinstance(file_content, CSharpSource):
+        return file_content
+    pieces = []
+    brace_matches = {}
+    open_braces = []
+    literal_spans = []
+    last_end = 0
+    for match in PATTERNS["csharp_token"].finditer(file_content):
+        kind = match.lastgroup
+        if kind in ('string', 'verbatim_string', 'char'):
+            literal_spans.append(match.span())
+        elif kind == 'open_brace':
+            open_braces.append(match.start())
+        elif kind == 'close_brace':
+            if open_braces:
+                brace_matches[open_braces.pop()] = match.start()
+        elif kind == 'line_comment':
+            pieces.append(file_content[last_end:match.start()])
+            pieces.append(' ' * (match.end() - match.start()))
+            last_end = match.end()
+        elif kind == 'block_comment':
+            pieces.append(file_content[last_end:match.start()])
+            pieces.append(PATTERNS["non_newline"].sub(' ', match.group()))
+            last_end = match.end()
+    pieces.append(file_content[last_end:])
+    return CSharpSource(file_content, ''.join(pieces), brace_matches, literal_spans)
+
+def split_base_list(bases):
+    """
+    Splits a class's base list into its types. Generic constraints are
+    dropped and commas inside generic arguments do not split.
+    """
+    constraint = PATTERNS["generic_constraint"].search(bases)
+    if constraint:
+        bases = bases[:constraint.start()]
+    items = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(bases):
+        if char == '<':
+            depth += 1
+        elif char == '>':
+            depth = max(0, depth - 1)
+        elif char == ',' and depth == 0:
+            items.append(bases[start:index].strip())
+            start = index + 1
+    items.append(bases[start:].strip())
+    return [item for item in items if item]
 
 def extract_implemented_interfaces(file_content):
     logging.debug("Extracting implemented interfaces and base classes.")
-    interface_pattern = re.compile(r'class\s+\w+\s*:\s*([^{]+)')
-    match = interface_pattern.search(file_content)
-    if match:
+    interfaces = []
+    base_classes = []
+    # Every class in the file, not only the first one
+    for match in PATTERNS["inheritance"].finditer(lex_csharp(file_content).code):
         logging.debug("Inheritance pattern matched in class definition.")
-        items = match.group(1).split(',')
-        interfaces = [item.strip() for item in items if item.strip().startswith('I')]
-        base_classes = [
-            item.strip()
-            for item in items
-            if not item.strip().startswith('I') and not item.strip().startswith('EssentialsPluginDeviceFactory')
-        ]
-        logging.debug(f"Interfaces extracted: {interfaces}")
-        logging.debug(f"Base classes extracted: {base_classes}")
-        return interfaces, base_classes
-    logging.debug("No implemented interfaces or base classes found.")
-    return [], []
+        for item in split_base_list(match.group(1)):
+            if item.startswith('I'):
+                interfaces.append(item)
+            elif not item.startswith('EssentialsPluginDeviceFactory'):
+                base_classes.append(item)
+    logging.debug("Interfaces extracted: %s", interfaces)
+    logging.debug("Base classes extracted: %s", base_classes)
+    return interfaces, base_classes
 
 def extract_supported_types(file_content):
     logging.debug("Extracting supported types.")
-    # Remove commented lines
-    uncommented_content = re.sub(r'//.*', '', file_content)
-    
-    # Updated regex to match TypeNames initialization
-    types_pattern = re.compile(r'TypeNames\s*=\s*new\s*List<string>\(\)\s*{([^}]+)}')
-    matches = types_pattern.findall(uncommented_content)
+    uncommented_content = lex_csharp(file_content).code
+
+    # Match TypeNames initialization
+    matches = PATTERNS["type_names"].findall(uncommented_content)
     types = []
     for match in matches:
         current_types = [type_name.strip().strip('"') for type_name in match.split(',')]
         types.extend(current_types)
-        logging.debug(f"Current types extracted: {current_types}")
+        logging.debug("Current types extracted: %s", current_types)
 
-    # Remove duplicates and filter out unnecessary entries
-    unique_types = list(set(filter(None, types)))
-    logging.debug(f"Unique supported types: {unique_types}")
+    # Remove duplicates and filter out unnecessary entries, keeping the
+    # declaration order so the README does not change from run to run
+    unique_types = list(dict.fromkeys(filter(None, types)))
+    logging.debug("Unique supported types: %s", unique_types)
     return unique_types
 
 def extract_minimum_essentials_framework_version(file_content):
     logging.debug("Extracting minimum Essentials Framework version.")
-    version_pattern = re.compile(r'^\s*MinimumEssentialsFrameworkVersion\s*=\s*"([^"]+)"\s*;', re.MULTILINE)
-    match = version_pattern.search(file_content)
+    match = PATTERNS["minimum_version"].search(lex_csharp(file_content).code)
     if match:
         version = match.group(1)
-        logging.debug(f"Minimum Essentials Framework Version found: {version}")
+        logging.debug("Minimum Essentials Framework Version found: %s", version)
         return version
     logging.debug("No Minimum Essentials Framework Version found.")
     return None
 
-def extract_public_methods(file_content):
-    logging.debug("Extracting public methods.")
-    methods_pattern = re.compile(r'public\s+\w+\s+\w+\s*\([^)]*\)\s*')
-    matches = methods_pattern.findall(file_content)
-    methods = [match.strip() for match in matches]
-    logging.debug(f"Public methods extracted: {methods}")
-    return methods
-
-def extract_public_feedbacks(file_content):
-    logging.debug("Starting feedback extraction...")
-    logging.debug(f"Input content length: {len(file_content)}")
-    
-    # Remove commented lines
-    uncommented_content = re.sub(r'//.*', '', file_content)
-    logging.debug(f"Content length after removing comments: {len(uncommented_content)}")
-    
-    # Define patterns for different feedback types with property syntax
-    bool_feedback_pattern = r'public\s+BoolFeedback\s+(\w+)(?:\s*{[^}]*}|\s*;|\s*=)'
-    int_feedback_pattern = r'public\s+IntFeedback\s+(\w+)(?:\s*{[^}]*}|\s*;|\s*=)'
-    string_feedback_pattern = r'public\s+StringFeedback\s+(\w+)(?:\s*{[^}]*}|\s*;|\s*=)'
-    
-    logging.debug(f"Using patterns:")
-    logging.debug(f"Bool pattern: {bool_feedback_pattern}")
-    logging.debug(f"Int pattern: {int_feedback_pattern}")
-    logging.debug(f"String pattern: {string_feedback_pattern}")
-    
-    # Find all matches
-    bool_feedbacks = re.findall(bool_feedback_pattern, uncommented_content)
-    int_feedbacks = re.findall(int_feedback_pattern, uncommented_content)
-    string_feedbacks = re.findall(string_feedback_pattern, uncommented_content)
-    
-    logging.debug(f"Raw matches found:")
-    logging.debug(f"Bool feedbacks: {bool_feedbacks}")
-    logging.debug(f"Int feedbacks: {int_feedbacks}")
-    logging.debug(f"String feedbacks: {string_feedbacks}")
-    
-    # Filter out any empty matches and strip whitespace
-    bool_feedbacks = [f.strip() for f in bool_feedbacks if f.strip()]
-    int_feedbacks = [f.strip() for f in int_feedbacks if f.strip()]
-    string_feedbacks = [f.strip() for f in string_feedbacks if f.strip()]
-    
-    logging.debug(f"After filtering:")
-    logging.debug(f"Bool feedbacks: {bool_feedbacks}")
-    logging.debug(f"Int feedbacks: {int_feedbacks}")
-    logging.debug(f"String feedbacks: {string_feedbacks}")
-    
-    feedbacks = {
-        'bool_feedbacks': bool_feedbacks,
-        'int_feedbacks': int_feedbacks,
-        'string_feedbacks': string_feedbacks
+def enclosing_class_finder(source):
+    """
+    Returns a function mapping an offset in source.code to the name of the
+    innermost class containing it, or None outside any class. Offsets must
+    be passed in increasing order: classes are then pushed on and popped
+    off a stack once each instead of being searched for every offset.
+    """
+    classes = [(declaration.start, declaration.end, declaration.name) for declaration in source.class_declarations()]
+    enclosing = []
+    next_class = 0
+
+    def find(position):
+        nonlocal next_class
+        while next_class < len(classes) and classes[next_class][0] < position:
+            enclosing.append(classes[next_class])
+            next_class += 1
+        while enclosing and enclosing[-1][1] < position:
+            enclosing.pop()
+        return enclosing[-1][2] if enclosing else None
+
+    return find
+
+def normalize_signature(text):
+    """Collapses the whitespace of a declaration: 'Task< bool >  Run( int a,int b )' becomes 'Task<bool> Run(int a, int b)'."""
+    text = " ".join(text.split())
+    text = PATTERNS["signature_open_space"].sub(r'\1', text)
+    text = PATTERNS["signature_close_space"].sub(r'\1', text)
+    return PATTERNS["signature_comma"].sub(', ', text)
+
+# Feedback types and the model list their members go to
+FEEDBACK_TYPES = {
+    "BoolFeedback": "bool_feedbacks",
+    "IntFeedback": "int_feedbacks",
+    "StringFeedback": "string_feedbacks",
+}
+# Declarations the member pattern matches that are not members
+NON_MEMBER_TYPES = {"class", "struct", "interface", "enum", "record", "delegate"}
+
+def extract_class_members(file_content):
+    """
+    Indexes the public methods, properties, events and feedbacks of every
+    class in one scan of the file. Each member goes to the innermost class
+    declaring it. Returns (class_name, [ClassMember, ...]) pairs in class
+    order; fields other than feedbacks are left out. Members whose class
+    declaration is not recognized are kept under the class name "".
+    """
+    logging.debug("Extracting class members.")
+    source = lex_csharp(file_content)
+    code = source.code
+    # Parentheses are counted without the literals, so "(" in a default
+    # argument or attribute does not unbalance them
+    parameter_code = None
+    find_class = enclosing_class_finder(source)
+    members = {}
+    position = 0
+    while True:
+        match = PATTERNS["member"].search(code, position)
+        if match is None:
+            break
+        position = match.end()
+        member_type = match.group('type')
+        if member_type in NON_MEMBER_TYPES:
+            continue
+        class_name = find_class(match.start())
+        tail = match.group('tail')
+        name = match.group('name')
+        member_type = normalize_signature(member_type)
+        keywords = ["public", *match.group('modifiers').split()]
+        if match.group('event'):
+            keywords.append("event")
+        signature = f"{' '.join(keywords)} {member_type} {name}"
+        if match.group('event'):
+            kind = "event"
+        elif tail == '(':
+            # Parameters may span lines and hold parentheses of their own
+            if parameter_code is None:
+                parameter_code = source.literal_free_code()
+            depth = 1
+            while depth:
+                token = PATTERNS["parameter_token"].search(parameter_code, position)
+                if token is None or token.group() not in '()':
+                    break
+                position = token.end()
+                depth += 1 if token.group() == '(' else -1
+            if depth:
+                # Not a parameter list after all; go on after the name
+                logging.debug("Unbalanced parameters for '%s'.", name)
+                position = match.end()
+                continue
+            kind = "method"
+            type_parameters = match.group('type_parameters') or ''
+            signature += normalize_signature(f"{type_parameters.strip()}({code[match.end():position - 1]})")
+        elif member_type in FEEDBACK_TYPES:
+            kind = "feedback"
+        elif tail in ('{', '=>'):
+            kind = "property"
+        else:
+            continue
+        if class_name is None:
+            # Outside any class the pattern recognized, e.g. one declared on
+            # the same line as its namespace; keep it rather than lose it
+            logging.debug("Public %s outside any recognized class: %s", kind, signature)
+            class_name = ""
+        else:
+            logging.debug("Public %s found in class '%s': %s", kind, class_name, signature)
+        members.setdefault(class_name, []).append(ClassMember(kind, name, member_type, signature))
+    if "" in members:
+        logging.warning("%s public members found outside any recognized class declaration; "
+                        "they are listed without a class.", len(members[""]))
+    return list(members.items())
+
+def extract_class_definitions(file_content):
+    logging.debug("Extracting class names and bases.")
+    class_defs = []
+    for declaration in lex_csharp(file_content).class_declarations():
+        base_classes = split_base_list(declaration.bases) if declaration.bases else []
+        logging.debug("Class '%s' with bases: %s", declaration.name, base_classes)
+        class_defs.append((declaration.name, base_classes))
+    return class_defs
+
+def extract_class_properties(file_content):
+    logging.debug("Extracting class properties.")
+    source = lex_csharp(file_content)
+    code = source.code
+    # All class definitions and the span of each class body
+    classes = [
+        (declaration.name, declaration.start, declaration.body_start, declaration.end)
+        for declaration in source.class_declarations()
+    ]
+
+    class_properties = []
+    for position, (class_name, _, class_start, end_index) in enumerate(classes):
+        # Scan only the parts of the body outside nested classes, so each
+        # character is matched once and properties belong to the innermost class
+        segments = []
+        cursor = class_start
+        for _, nested_start, _, nested_end in classes[position + 1:]:
+            if nested_start >= end_index:
+                break
+            if nested_start >= cursor:
+                segments.append(code[cursor:nested_start])
+                cursor = nested_end + 1
+        segments.append(code[cursor:end_index])
+
+        properties = []
+        for segment in segments:
+            for prop_match in PATTERNS["property"].finditer(segment):
+                prop_string = prop_match.group(0)
+                json_property_match = PATTERNS["json_property"].search(prop_string)
+                json_property_name = json_property_match.group(1) if json_property_match else None
+                prop_type = prop_match.group(1).strip()
+                prop_name = prop_match.group(2)
+                properties.append(ClassProperty(
+                    json_property_name if json_property_name else prop_name,
+                    prop_name,
+                    prop_type
+                ))
+                logging.debug("Property found in class '%s': %s (%s)", class_name, prop_name, prop_type)
+        class_properties.append((class_name, properties))
+    return class_properties
+
+# The PATTERNS entry doing most of the work in each extractor, for profiles
+EXTRACTOR_PATTERNS = {
+    "lex_csharp": "csharp_token",
+    "extract_implemented_interfaces": "inheritance",
+    "extract_supported_types": "type_names",
+    "extract_minimum_essentials_framework_version": "minimum_version",
+    "extract_class_members": "member",
+    "extract_class_definitions": "class_declaration",
+    "extract_class_properties": "property",
+    "extract_joinmap_entries": "join",
+}
+
+class Profiler:
+    """
+    Collects wall and CPU time and call counts per pipeline phase and per
+    extractor, plus the total time and slowest extractor of every file.
+    With trace_memory, the peak memory allocated while reading and
+    extracting each file is recorded as well.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.phases = {}
+        self.extractors = {}
+        self.counters = {}
+        self.files = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        wall_start, cpu_start = perf_counter(), process_time()
+        try:
+            yield
+        finally:
+            totals = self.phases.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += perf_counter() - wall_start
+            totals[1] += process_time() - cpu_start
+            totals[2] += 1
+
+    def count(self, name):
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def add_file(self, file_path, timings, peak_bytes=None):
+        for name, wall, cpu in timings:
+            totals = self.extractors.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += 1
+        if timings:
+            slowest = max(timings, key=lambda timing: timing[1])
+            self.files.append((sum(timing[1] for timing in timings), file_path, slowest[0], slowest[1], peak_bytes))
+
+    def format_summary(self, top=10):
+        """Returns the profile as markdown tables, for the console and the GitHub step summary."""
+        lines = ["### metadata.py profile", "", "| Phase | Wall (s) | CPU (s) | Calls |", "| --- | --- | --- | --- |"]
+        for name, (wall, cpu, calls) in self.phases.items():
+            lines.append(f"| {name} | {wall:.4f} | {cpu:.4f} | {calls} |")
+        lines.extend(["", "| Extractor | Pattern | Wall (s) | CPU (s) | Calls |", "| --- | --- | --- | --- | --- |"])
+        for name, (wall, cpu, calls) in sorted(self.extractors.items(), key=lambda item: -item[1][0]):
+            lines.append(f"| {name} | {EXTRACTOR_PATTERNS.get(name, '-')} | {wall:.4f} | {cpu:.4f} | {calls} |")
+        if self.counters:
+            lines.extend(["", "| Function | Calls |", "| --- | --- |"])
+            for name, calls in self.counters.items():
+                lines.append(f"| {name} | {calls} |")
+        if self.files:
+            lines.extend(["", f"| Slowest files (top {top}) | Wall (s) | Slowest extractor | Pattern | Wall (s) |",
+                          "| --- | --- | --- | --- | --- |"])
+            for total, file_path, name, wall, _ in sorted(self.files, key=lambda item: -item[0])[:top]:
+                lines.append(f"| {file_path} | {total:.4f} | {name} | {EXTRACTOR_PATTERNS.get(name, '-')} | {wall:.4f} |")
+        if self.trace_memory and self.files:
+            lines.extend(["", f"| Largest peak memory (top {top}) | Peak MiB | Wall (s) |", "| --- | --- | --- |"])
+            by_peak = sorted(self.files, key=lambda item: -(item[4] or 0))
+            for total, file_path, _, _, peak_bytes in by_peak[:top]:
+                lines.append(f"| {file_path} | {(peak_bytes or 0) / (1024 * 1024):.2f} | {total:.4f} |")
+        return "\n".join(lines) + "\n"
+
+def profile_phase(name):
+    """Times the enclosed block as a phase of the active profile, if any."""
+    if PROFILER is None:
+        return contextlib.nullcontext()
+    return PROFILER.phase(name)
+
+class ExtractionTimeout(Exception):
+    """Raised when extracting a single file exceeds its time budget."""
+
+@contextlib.contextmanager
+def extraction_time_budget(seconds):
+    """
+    Bounds the time spent extracting one file to seconds (None or 0 for no
+    limit). In the main thread on platforms with SIGALRM a timer interrupts
+    even a single long-running regex match; elsewhere the yielded deadline
+    is checked by run_extractor between extractors.
+    Raises ExtractionTimeout when the budget is exceeded.
+    """
+    if not seconds:
+        yield None
+        return
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield perf_counter() + seconds
+        return
+
+    def on_alarm(signum, frame):
+        raise ExtractionTimeout(f"extraction exceeded the {seconds:g}s time budget")
+
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+def run_extractor(timings, extractor, argument, deadline=None):
+    """
+    Calls extractor(argument). When timings is a list, the extractor's name
+    and its wall and CPU time are appended to it.
+    Raises ExtractionTimeout instead if deadline has already passed.
+    """
+    if deadline is not None and perf_counter() > deadline:
+        raise ExtractionTimeout(f"extraction exceeded its time budget before {extractor.__name__}")
+    if timings is None:
+        return extractor(argument)
+    wall_start, cpu_start = perf_counter(), process_time()
+    result = extractor(argument)
+    timings.append((extractor.__name__, perf_counter() - wall_start, process_time() - cpu_start))
+    return result
+
+# Text each extractor's patterns cannot match without. A file that lacks
+# an extractor's keyword gets its empty result without running it, and a
+# file that lacks all of them is not even lexed. Keywords inside comments
+# only cost a wasted run, never a missed match.
+EXTRACTOR_KEYWORDS = {
+    "extract_implemented_interfaces": "class",
+    "extract_supported_types": "TypeNames",
+    "extract_minimum_essentials_framework_version": "MinimumEssentialsFrameworkVersion",
+    "extract_class_members": "public",
+    "extract_class_definitions": "class",
+    "extract_class_properties": "class",
+    "extract_joinmap_entries": "[JoinName(",
+}
+
+def empty_file_record():
+    """Returns the record of a file in which no extractor finds anything."""
+    return {
+        "interfaces": [],
+        "base_classes": [],
+        "supported_types": [],
+        "minimum_version": None,
+        "class_members": [],
+        "class_defs": [],
+        "class_properties": [],
+        "joins": []
+    }
+
+def intern_names(values):
+    return [sys.intern(value) if isinstance(value, str) else value for value in values]
+
+def compact_file_record(record):
+    """
+    Returns record with its class properties and joins as ClassProperty and
+    JoinEntry tuples and every name and type in it interned, so the records
+    of a large tree, or of a whole batch, share one copy of each string.
+    Records reach the main process as JSON lists from the cache and as
+    unpickled copies from the extraction workers; both pass through here.
+    """
+    return {
+        "interfaces": intern_names(record["interfaces"]),
+        "base_classes": intern_names(record["base_classes"]),
+        "supported_types": intern_names(record["supported_types"]),
+        "minimum_version": record["minimum_version"],
+        "class_members": [
+            (sys.intern(class_name), [ClassMember._make(intern_names(member)) for member in members])
+            for class_name, members in record["class_members"]
+        ],
+        "class_defs": [
+            (sys.intern(class_name), intern_names(base_classes))
+            for class_name, base_classes in record["class_defs"]
+        ],
+        "class_properties": [
+            (sys.intern(class_name), [ClassProperty._make(intern_names(prop)) for prop in properties])
+            for class_name, properties in record["class_properties"]
+        ],
+        "joins": [JoinEntry._make(intern_names(join)) for join in record["joins"]]
     }
-    
-    logging.debug(f"Final extracted feedbacks: {feedbacks}")
-    return feedbacks
 
-def read_files_in_directory(directory):
-    logging.debug(f"Reading files in directory: {directory}")
+def extract_file_metadata(file_content, timings=None, time_budget=None):
+    """
+    Runs the extractors over the content of a single file.
+    The file is lexed once and the result is shared by all extractors;
+    extractors whose EXTRACTOR_KEYWORDS entry is not in the file are skipped.
+    Returns a record holding the output of each extractor for that file.
+    Passing a timings list collects the time spent in each extractor, and
+    time_budget (seconds) raises ExtractionTimeout for files that take longer.
+    """
+    text = file_content.text if isinstance(file_content, CSharpSource) else file_content
+    found = {keyword for keyword in set(EXTRACTOR_KEYWORDS.values()) if keyword in text}
+    extractors = [
+        (field, extractor)
+        for field, extractor in (
+            ("interfaces", extract_implemented_interfaces),
+            ("supported_types", extract_supported_types),
+            ("minimum_version", extract_minimum_essentials_framework_version),
+            ("class_members", extract_class_members),
+            ("class_defs", extract_class_definitions),
+            ("class_properties", extract_class_properties),
+            ("joins", extract_joinmap_entries)
+        )
+        if EXTRACTOR_KEYWORDS[extractor.__name__] in found
+    ]
+    record = empty_file_record()
+    if not extractors:
+        return record
+    with extraction_time_budget(time_budget) as deadline:
+        source = run_extractor(timings, lex_csharp, file_content, deadline)
+        for field, extractor in extractors:
+            result = run_extractor(timings, extractor, source, deadline)
+            if field == "interfaces":
+                record["interfaces"], record["base_classes"] = result
+            else:
+                record[field] = result
+    return record
+
+@contextlib.contextmanager
+def map_source_file(file_path):
+    """
+    Yields the bytes of the file: a read-only memory map for files of
+    MMAP_THRESHOLD bytes or more, so large files can be hashed or decoded
+    without a copy of their raw bytes, and the plainly read bytes otherwise.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+def source_file_digest(file_path):
+    """Returns the sha256 of a source file's bytes."""
+    with map_source_file(file_path) as mapped:
+        return hashlib.sha256(mapped).hexdigest()
+
+def read_source_file(file_path):
+    """
+    Returns the decoded text of a source file, with newlines normalized the
+    same way text-mode open() does. Large files are decoded straight from
+    the memory map and the text is only copied again when it contains
+    carriage returns, so a file costs one string in memory however large
+    it is.
+    """
+    with map_source_file(file_path) as mapped:
+        content = str(mapped, 'utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+class ExtractionCache:
+    """
+    On-disk cache of extract_file_metadata records, keyed by the file path
+    relative to the project directory. An entry is reused when the file's
+    mtime and size are unchanged, or failing that when its content hash
+    matches. The whole cache is discarded when CACHE_SCHEMA_VERSION or
+    EXTRACTOR_VERSION changes.
+    The git revision README.md was last rendered from is saved alongside
+    them so --since can work out which files changed after that run.
+    Records are also indexed by content hash, so a moved file, or the same
+    file in another repository when shared_records is shared between caches
+    in batch mode, is not extracted again.
+    """
+
+    def __init__(self, cache_path, shared_records=None):
+        self.cache_path = cache_path
+        self.revision = None
+        self.entries = {}
+        self.records_by_digest = shared_records if shared_records is not None else {}
+        self.seen = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        if not os.path.exists(self.cache_path):
+            logging.debug("No extraction cache at %s.", self.cache_path)
+            return self
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable extraction cache %s: %s", self.cache_path, e)
+            return self
+        if data.get("schema") != CACHE_SCHEMA_VERSION or data.get("extractor_version") != EXTRACTOR_VERSION:
+            logging.info("Extraction cache was written by another extractor version. Rebuilding.")
+            return self
+        self.entries = data.get("files", {})
+        self.revision = data.get("revision")
+        for entry in self.entries.values():
+            # A file shared with another project of the batch reuses its record
+            entry["record"] = self.records_by_digest.setdefault(entry["sha256"], compact_file_record(entry["record"]))
+        logging.debug("Loaded %s cached file records.", len(self.entries))
+        return self
+
+    def is_fresh(self, key, stat):
+        """Returns True if the entry for key has the same mtime and size as stat."""
+        entry = self.entries.get(key)
+        return bool(entry) and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+
+    def lookup(self, key, stat):
+        """Fast path: returns the cached record if mtime and size are unchanged."""
+        if self.is_fresh(key, stat):
+            entry = self.entries[key]
+            self.hits += 1
+            self.seen[key] = entry
+            return entry["record"]
+        return None
+
+    def lookup_hash(self, key, stat, digest):
+        """Returns the cached record if the content hash matches, refreshing mtime and size."""
+        entry = self.entries.get(key)
+        record = entry["record"] if entry and entry["sha256"] == digest else self.records_by_digest.get(digest)
+        if record is not None:
+            self.hits += 1
+            self.store(key, stat, digest, record)
+            return record
+        self.misses += 1
+        return None
+
+    def stale_keys(self, directory):
+        """
+        Returns the keys whose file under directory is gone or no longer has
+        the cached mtime and size: files edited, reverted or removed since
+        the previous run, whether or not git sees them as changed.
+        """
+        def stat(key):
+            return os.stat(os.path.join(directory, *key.split('/')))
+
+        return [
+            key for key, file_stat, error in prefetch_in_order(list(self.entries), stat)
+            if error is not None or not self.is_fresh(key, file_stat)
+        ]
+
+    def store(self, key, stat, digest, record):
+        self.records_by_digest.setdefault(digest, record)
+        self.seen[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "record": record
+        }
+
+    def save(self, revision=None):
+        """Writes the entries seen during this run; files that disappeared are dropped."""
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        data = {
+            "schema": CACHE_SCHEMA_VERSION,
+            "extractor_version": EXTRACTOR_VERSION,
+            "revision": revision,
+            "files": self.seen
+        }
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.cache_path)
+        logging.info("Extraction cache: %s hits, %s misses.", self.hits, self.misses)
+
+def source_order_key(relative_path):
+    """
+    Sort key that orders relative paths the way find_source_files walks
+    them: files of a directory first, then its subdirectories, all by name.
+    """
+    parts = relative_path.replace(os.sep, '/').split('/')
+    return tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+
+def matches_ignore_glob(relative_path, ignore_globs=None):
+    """
+    Returns True when a '/'-separated path relative to the project, or its
+    last component, matches one of ignore_globs (IGNORE_GLOBS by default).
+    """
+    name = relative_path.rsplit('/', 1)[-1]
+    for glob in IGNORE_GLOBS if ignore_globs is None else ignore_globs:
+        if fnmatch.fnmatch(name, glob) or fnmatch.fnmatch(relative_path, glob):
+            return True
+    return False
+
+def is_ignored_path(relative_path, ignore_globs=None):
+    """Returns True when relative_path or any directory above it matches an ignore glob."""
+    parts = relative_path.replace(os.sep, '/').split('/')
+    return any(matches_ignore_glob('/'.join(parts[:depth]), ignore_globs) for depth in range(1, len(parts) + 1))
+
+def walk_project(directory, ignore_globs=None):
+    """
+    os.walk over directory in sorted order that does not descend into
+    ignored directories. Yields (root, relative root, dirs, files) with
+    ignored files already removed.
+    """
+    for root, dirs, files in os.walk(directory):
+        relative_root = os.path.relpath(root, directory).replace(os.sep, '/')
+        prefix = "" if relative_root == "." else relative_root + "/"
+        dirs[:] = sorted(name for name in dirs if not matches_ignore_glob(prefix + name, ignore_globs))
+        files = sorted(name for name in files if not matches_ignore_glob(prefix + name, ignore_globs))
+        yield root, relative_root, dirs, files
+
+def find_source_files(directory, ignore_globs=None):
+    """
+    Walks the directory tree once and returns the C# files in sorted path
+    order, so results never depend on filesystem enumeration order.
+    Directories and files matching the ignore globs are skipped.
+    """
+    file_paths = []
+    for root, _, _, files in walk_project(directory, ignore_globs):
+        logging.debug("Entering directory: %s", root)
+        for file in files:
+            if file.endswith('.cs'):
+                file_paths.append(os.path.join(root, file))
+    return file_paths
+
+def resolve_job_count(jobs, file_count):
+    """
+    Returns the number of worker processes to extract file_count files with.
+    A jobs value of None or 0 selects automatically: small trees run serially
+    so they do not pay the process pool startup cost.
+    """
+    if jobs:
+        return max(1, jobs)
+    if file_count < PARALLEL_FILE_THRESHOLD:
+        return 1
+    return max(1, min(os.cpu_count() or 1, file_count // PARALLEL_FILE_THRESHOLD))
+
+def prefetch_in_order(items, function, threads=None, depth=None):
+    """
+    Yields (item, result, error) for each of items, in order, while up to
+    threads threads run function on the items ahead. At most depth results
+    wait to be consumed, which bounds the memory they hold. With threads
+    set to 0, function runs inline as each item is consumed.
+    """
+    threads = IO_THREADS if threads is None else threads
+    depth = max(threads, PREFETCH_DEPTH if depth is None else depth)
+    if threads <= 0 or len(items) < 2:
+        for item in items:
+            try:
+                yield item, function(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+    iterator = iter(items)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        queue = collections.deque((item, pool.submit(function, item)) for item in itertools.islice(iterator, depth))
+        while queue:
+            item, future = queue.popleft()
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            # Refill before handing the result over, so reads overlap with its processing
+            for next_item in itertools.islice(iterator, 1):
+                queue.append((next_item, pool.submit(function, next_item)))
+            yield item, result, error
+
+def extract_files(items, profile=False, time_budget=None, trace_memory=False, io_threads=None):
+    """
+    Extracts (index, file_path) items one at a time, yielding an
+    (index, record, error, timed_out, timings, peak_bytes) tuple as each
+    file is done. Files are read ahead on io_threads threads, at most
+    PREFETCH_DEPTH at a time, so read latency overlaps with extraction
+    without holding every file in memory.
+    timings is the per-extractor timing list when profile is set, otherwise
+    None. Files exceeding time_budget seconds are returned with timed_out set.
+    With trace_memory, peak_bytes is the most memory allocated at any point
+    while reading and extracting the file, as traced by tracemalloc; files
+    are then read inline so other reads do not count towards it.
+    """
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    contents = prefetch_in_order([file_path for _, file_path in items], read_source_file,
+                                 0 if trace_memory else io_threads)
+    for index, file_path in items:
+        timings = [] if profile else None
+        if trace_memory:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        record, error, file_timed_out = None, None, False
+        try:
+            _, content, read_error = next(contents)
+            if read_error is not None:
+                raise read_error
+            record = extract_file_metadata(content, timings, time_budget)
+        except ExtractionTimeout as e:
+            error, file_timed_out = str(e), True
+        except Exception as e:
+            error = str(e)
+        peak_bytes = tracemalloc.get_traced_memory()[1] - traced_before if trace_memory else None
+        yield index, record, error, file_timed_out, timings, peak_bytes
+
+def extract_file_chunk(chunk, profile=False, time_budget=None, trace_memory=False, io_threads=None):
+    """Process pool worker: returns the extract_files results for a whole chunk."""
+    return list(extract_files(chunk, profile, time_budget, trace_memory, io_threads))
+
+def create_extraction_pool(job_count):
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=job_count,
+        initializer=configure_logging,
+        initargs=(logging.getLevelName(logging.getLogger().getEffectiveLevel()),)
+    )
+
+def load_file_records(directory, file_paths, cache=None, jobs=None, executor=None, timed_out=None, on_record=None):
+    """
+    Returns the extraction record for each path in file_paths, in the same
+    order, with None for files that could not be processed.
+    Records are taken from the optional ExtractionCache when possible; the
+    remaining files are extracted serially or fanned out to a process pool.
+    A shared executor, as used in batch mode, replaces the per-call pool.
+    Files skipped for exceeding FILE_TIME_BUDGET are appended to timed_out.
+    Only paths are queued for extraction; each file is read by the worker
+    that extracts it, so memory does not grow with the size of the tree.
+    Cache checks stat and hash files on IO_THREADS threads as well.
+    on_record, when given, is called with each file path and its record in
+    file_paths order as soon as the record and those before it are known,
+    so records are streamed out while extraction is still running.
+    """
+    records = [None] * len(file_paths)
+    # Whether each file's record, or its failure, is known yet
+    done = [False] * len(file_paths)
+    emitted = 0
+    pending = []
+    cache_info = {}
+
+    def emit():
+        nonlocal emitted
+        while emitted < len(file_paths) and done[emitted]:
+            if records[emitted] is not None:
+                on_record(file_paths[emitted], records[emitted])
+            emitted += 1
+
+    def probe(file_path):
+        # The hash is only needed when mtime and size no longer match
+        cache_key = os.path.relpath(file_path, directory).replace(os.sep, '/')
+        stat = os.stat(file_path)
+        digest = None if cache.is_fresh(cache_key, stat) else source_file_digest(file_path)
+        return cache_key, stat, digest
+
+    with profile_phase("cache_lookup"):
+        if cache is None:
+            pending = list(enumerate(file_paths))
+        else:
+            for index, (file_path, probed, error) in enumerate(prefetch_in_order(file_paths, probe)):
+                logging.debug("Processing C# file: %s", file_path)
+                if error is not None:
+                    logging.error("Error processing file %s: %s", file_path, error)
+                    done[index] = True
+                    continue
+                cache_key, stat, digest = probed
+                if digest is None:
+                    record = cache.lookup(cache_key, stat)
+                else:
+                    record = cache.lookup_hash(cache_key, stat, digest)
+                    cache_info[index] = probed
+                if record is None:
+                    pending.append((index, file_path))
+                else:
+                    logging.debug("Using cached record for: %s", file_path)
+                    done[index] = True
+                records[index] = record
+
+    options = {
+        "profile": PROFILER is not None,
+        "time_budget": FILE_TIME_BUDGET,
+        "trace_memory": PROFILER is not None and PROFILER.trace_memory,
+        "io_threads": IO_THREADS,
+    }
+    if executor is not None:
+        job_count = max(1, jobs or os.cpu_count() or 1)
+    else:
+        job_count = resolve_job_count(jobs, len(pending))
+
+    def extract():
+        # Results come back in pending order, chunk by chunk from a pool
+        if pending and (executor is not None or job_count > 1):
+            chunk_size = max(1, min(PARALLEL_CHUNK_SIZE, len(pending) // (job_count * 4)))
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            logging.info("Extracting %s files with %s processes in %s chunks.", len(pending), job_count, len(chunks))
+            worker = functools.partial(extract_file_chunk, **options)
+            if executor is not None:
+                for result in executor.map(worker, chunks):
+                    yield from result
+            else:
+                with create_extraction_pool(job_count) as pool:
+                    for result in pool.map(worker, chunks):
+                        yield from result
+        else:
+            yield from extract_files(pending, **options)
+
+    if on_record is not None:
+        emit()
+    with profile_phase("extraction"):
+        for index, record, error, file_timed_out, timings, peak_bytes in extract():
+            # Results are placed by index, so the merge order never depends on scheduling
+            done[index] = True
+            if timings is not None:
+                PROFILER.add_file(file_paths[index], timings, peak_bytes)
+            if file_timed_out:
+                logging.warning("Skipping %s: %s.", file_paths[index], error)
+                if timed_out is not None:
+                    timed_out.append(file_paths[index])
+            elif error is not None:
+                logging.error("Error processing file %s: %s", file_paths[index], error)
+            else:
+                record = compact_file_record(record)
+                records[index] = record
+                if index in cache_info:
+                    cache.store(*cache_info[index], record)
+            if on_record is not None:
+                emit()
+    return records
+
+def merge_file_records(file_paths, records, timed_out=()):
+    """
+    Merges per-file records, in file_paths order, into the scan result.
+    timed_out lists the files skipped for exceeding the extraction time
+    budget.
+    """
     all_interfaces = []
     all_base_classes = []
     all_supported_types = []
     all_minimum_versions = []
-    all_public_methods = []
-    all_feedbacks = {
-        'bool_feedbacks': [],
-        'int_feedbacks': [],
-        'string_feedbacks': []
-    }
+    all_feedbacks = {feedback_list: [] for feedback_list in FEEDBACK_TYPES.values()}
+    class_members = {}
+    class_defs = {}
+    all_class_defs = {}
+    file_index = {}
+    class_files = {}
+    file_joins = {}
+
+    for file_path, record in zip(file_paths, records):
+        file_index.setdefault(os.path.basename(file_path), []).append(file_path)
+        if record is None:
+            continue
+        all_interfaces.extend(record["interfaces"])
+        all_base_classes.extend(record["base_classes"])
+        all_supported_types.extend(record["supported_types"])
+        if record["minimum_version"]:
+            all_minimum_versions.append(record["minimum_version"])
+        for class_name, members in record["class_members"]:
+            # Partial classes collect the members of every declaration
+            class_members.setdefault(class_name, []).extend(members)
+            for member in members:
+                if member.kind == "feedback":
+                    all_feedbacks[FEEDBACK_TYPES[member.type]].append(member.name)
+        for class_name, base_classes in record["class_defs"]:
+            # Partial classes list their bases across several declarations
+            known_bases = class_defs.setdefault(class_name, [])
+            known_bases.extend(base for base in base_classes if base not in known_bases)
+            paths = class_files.setdefault(class_name, [])
+            if file_path not in paths:
+                paths.append(file_path)
+        for class_name, properties in record["class_properties"]:
+            all_class_defs[class_name] = properties
+        file_joins[file_path] = record["joins"]
+
+        logging.debug("Extracted from %s:", file_path)
+        logging.debug("- Interfaces: %s", record['interfaces'])
+        logging.debug("- Base classes: %s", record['base_classes'])
+        logging.debug("- Members: %s", record['class_members'])
 
-    for root, _, files in os.walk(directory):
-        logging.debug(f"Entering directory: {root}")
-        for file in files:
-            if file.endswith('.cs'):
-                file_path = os.path.join(root, file)
-                logging.debug(f"Processing C# file: {file_path}")
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        logging.debug(f"Successfully read file: {file_path}")
-                        interfaces, base_classes = extract_implemented_interfaces(content)
-                        supported_types = extract_supported_types(content)
-                        minimum_version = extract_minimum_essentials_framework_version(content)
-                        public_methods = extract_public_methods(content)
-                        feedbacks = extract_public_feedbacks(content)
-
-                        all_interfaces.extend(interfaces)
-                        all_base_classes.extend(base_classes)
-                        all_supported_types.extend(supported_types)
-                        if minimum_version:
-                            all_minimum_versions.append(minimum_version)
-                        all_public_methods.extend(public_methods)
-                        all_feedbacks['bool_feedbacks'].extend(feedbacks['bool_feedbacks'])
-                        all_feedbacks['int_feedbacks'].extend(feedbacks['int_feedbacks'])
-                        all_feedbacks['string_feedbacks'].extend(feedbacks['string_feedbacks'])
-                        
-                        logging.debug(f"Extracted from {file_path}:")
-                        logging.debug(f"- Interfaces: {interfaces}")
-                        logging.debug(f"- Base classes: {base_classes}")
-                        logging.debug(f"- Feedbacks: {feedbacks}")
-                except Exception as e:
-                    logging.error(f"Error processing file {file_path}: {str(e)}")
-
-    logging.debug("Finished reading all files.")
-    logging.debug(f"Total feedbacks collected: {all_feedbacks}")
     return {
-        "interfaces": all_interfaces,
-        "base_classes": all_base_classes,
-        "supported_types": all_supported_types,
-        "minimum_versions": all_minimum_versions,
-        "public_methods": all_public_methods,
-        "feedbacks": all_feedbacks
+        "results": {
+            "interfaces": all_interfaces,
+            "base_classes": all_base_classes,
+            "supported_types": all_supported_types,
+            "minimum_versions": all_minimum_versions,
+            "feedbacks": all_feedbacks
+        },
+        "class_members": class_members,
+        "class_defs": class_defs,
+        "all_class_defs": all_class_defs,
+        "file_index": file_index,
+        "class_files": class_files,
+        "file_joins": file_joins,
+        "file_count": len(file_paths),
+        "timed_out": list(timed_out)
     }
 
-def read_class_names_and_bases_from_files(directory):
-    logging.debug(f"Reading class names and bases from files in directory: {directory}")
-    class_defs = {}
-    class_pattern = re.compile(
-        r'^\s*(?:\[[^\]]+\]\s*)*'        # Optional attributes
-        r'(?:public\s+|private\s+|protected\s+)?'  # Optional access modifier
-        r'(?:partial\s+)?'                # Optional 'partial' keyword
-        r'class\s+([A-Za-z_]\w*)'         # Class name
-        r'(?:\s*:\s*([^\{]+))?'           # Optional base classes
-        r'\s*\{',                         # Opening brace
-        re.MULTILINE
-    )
-    for root, _, files in os.walk(directory):
-        logging.debug(f"Entering directory: {root}")
-        for file in files:
-            if file.endswith('.cs'):
-                file_path = os.path.join(root, file)
-                logging.debug(f"Processing file: {file_path}")
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    for match in class_pattern.finditer(content):
-                        class_name = match.group(1)
-                        bases = match.group(2)
-                        if bases:
-                            base_classes = [b.strip() for b in bases.split(',')]
-                        else:
-                            base_classes = []
-                        logging.debug(f"Class '{class_name}' with bases: {base_classes}")
-                        class_defs[class_name] = base_classes
-    logging.debug("Finished reading class definitions.")
-    return class_defs
+def scan_directory(directory, cache=None, jobs=None, executor=None, on_record=None):
+    """
+    Walks the directory tree once, reading each C# file a single time and
+    passing its content to every extractor.
+    Files whose records are found in the optional ExtractionCache are not
+    re-extracted; jobs sets the number of extraction processes (None or 0
+    selects automatically).
+    Returns the merged results, the class/base map and the class properties.
+    """
+    logging.debug("Scanning directory: %s", directory)
+    with profile_phase("walk"):
+        file_paths = find_source_files(directory)
+    timed_out = []
+    records = load_file_records(directory, file_paths, cache, jobs, executor, timed_out, on_record)
+    logging.debug("Finished scanning all files.")
+    with profile_phase("merge"):
+        return merge_file_records(file_paths, records, timed_out=timed_out)
 
-def find_joinmap_classes(class_defs):
-    logging.debug("Finding classes that inherit from 'JoinMapBaseAdvanced'.")
-    joinmap_classes = []
-    for class_name, base_classes in class_defs.items():
-        if 'JoinMapBaseAdvanced' in base_classes:
-            logging.debug(f"Class '{class_name}' is a JoinMap class.")
-            joinmap_classes.append(class_name)
-    return joinmap_classes
+def run_git(directory, *git_args):
+    """Runs git in directory and returns its stdout lines, or None if git fails."""
+    try:
+        completed = subprocess.run(
+            ["git", *git_args], cwd=directory, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.debug("git %s failed: %s", " ".join(git_args), e)
+        return None
+    return [line for line in completed.stdout.splitlines() if line]
 
-def find_file_in_directory(filename, root_directory):
-    logging.debug(f"Searching for file '{filename}' in directory: {root_directory}")
-    for root, _, files in os.walk(root_directory):
-        if filename in files:
-            full_path = os.path.join(root, filename)
-            logging.debug(f"File found: {full_path}")
-            return full_path
-    logging.debug(f"File '{filename}' not found in directory '{root_directory}'.")
-    return None
+def git_revision(directory):
+    lines = run_git(directory, "rev-parse", "HEAD")
+    return lines[0] if lines else None
 
-def parse_joinmap_info(class_name, root_directory):
-    logging.debug(f"Parsing join map info for class '{class_name}'.")
-    filename = f"{class_name}.cs"
-    file_path = find_file_in_directory(filename, root_directory)
+def find_changed_source_files(directory, refs):
+    """
+    Returns the C# files, relative to directory, that differ between any of
+    refs and the working tree, including untracked files.
+    Returns None when git cannot answer for one of the refs.
+    """
+    changed = set()
+    for ref in dict.fromkeys(ref for ref in refs if ref):
+        # Without rename detection a moved file lists both its old and new path
+        lines = run_git(directory, "diff", "--name-only", "--no-renames", "--relative", ref, "--", "*.cs")
+        if lines is None:
+            logging.warning("Could not list files changed since %s.", ref)
+            return None
+        changed.update(lines)
+    untracked = run_git(directory, "ls-files", "--others", "--exclude-standard", "--", "*.cs")
+    if untracked is None:
+        return None
+    changed.update(untracked)
+    return sorted((path for path in changed if not is_ignored_path(path)), key=source_order_key)
 
-    if not file_path:
-        logging.warning(f"File not found: {filename}. Skipping...")
-        return []
+def scan_changed_files(directory, cache, changed_files, jobs=None, executor=None, on_record=None):
+    """
+    Scans the files of the previous run held in cache together with
+    changed_files (relative paths), without walking the tree. Every file
+    goes through the cache's mtime, size and content hash checks, so only
+    changed files are extracted and no record is trusted unchecked.
+    Files that no longer exist are dropped, whether changed or cached, so
+    their records are neither merged nor saved again.
+    """
+    logging.info("Re-extracting %s changed files.", len(changed_files))
+    changed = set(changed_files)
+    relative_paths = [key for key in cache.entries if key not in changed and not is_ignored_path(key)]
+    relative_paths.extend(changed)
+    relative_paths = [path for path in relative_paths if os.path.isfile(os.path.join(directory, path))]
+    relative_paths.sort(key=source_order_key)
 
-    with open(file_path, 'r', encoding='utf-8') as file:
-        file_content = file.read()
+    file_paths = [os.path.join(directory, *path.split('/')) for path in relative_paths]
+    timed_out = []
+    records = load_file_records(directory, file_paths, cache, jobs, executor, timed_out, on_record)
+    with profile_phase("merge"):
+        return merge_file_records(file_paths, records, timed_out=timed_out)
 
-    # Remove comments to prevent interference with regex
-    file_content = re.sub(r'//.*', '', file_content)
-    file_content = re.sub(r'/\*.*?\*/', '', file_content, flags=re.DOTALL)
+def normalize_type_name(type_name):
+    """
+    Reduces a type reference to the bare class name the symbol index uses:
+    'global::PepperDash.Essentials.Core.JoinMapBaseAdvanced' becomes
+    'JoinMapBaseAdvanced' and 'IHasFeedback<string>' becomes 'IHasFeedback'.
+    """
+    type_name = type_name.strip()
+    if type_name.startswith('global::'):
+        type_name = type_name[len('global::'):]
+    return type_name.split('<', 1)[0].rsplit('.', 1)[-1].strip()
 
-    # Updated regex to handle multiline definitions and optional parameters
-    join_pattern = re.compile(
-        r'\[JoinName\("(?P<join_name>[^"]+)"\)\]\s*'                  # [JoinName("...")]
-        r'public\s+JoinDataComplete\s+(?P<property_name>\w+)\s*=\s*'   # public JoinDataComplete PropertyName =
-        r'new\s+JoinDataComplete\s*\(\s*'                             # new JoinDataComplete(
-        r'(?P<join_params>.*?)\)\s*;',                                # Capture everything inside the parentheses
-        re.DOTALL
-    )
+class SymbolIndex:
+    """
+    The class hierarchy of a project, built once per run from the merged
+    class definitions. It maps each class to its files and its normalized
+    bases, and each base to its direct subclasses, so inheritance queries
+    only visit the classes they return instead of rescanning every class.
+    """
+
+    def __init__(self, class_defs, class_files=None):
+        self.files = class_files or {}
+        self.order = {class_name: position for position, class_name in enumerate(class_defs)}
+        self.bases = {}
+        self.subclasses = {}
+        for class_name, base_classes in class_defs.items():
+            bases = remove_duplicates_preserve_order([normalize_type_name(base) for base in base_classes])
+            self.bases[class_name] = bases
+            for base in bases:
+                self.subclasses.setdefault(base, []).append(class_name)
+        self.derived = {}
+
+    def derived_classes(self, base_class):
+        """
+        Returns the classes deriving from base_class, directly or through
+        other classes of the project, in declaration order.
+        """
+        base_class = normalize_type_name(base_class)
+        if base_class not in self.derived:
+            found = set()
+            pending = [base_class]
+            while pending:
+                for subclass in self.subclasses.get(pending.pop(), ()):
+                    if subclass not in found:
+                        found.add(subclass)
+                        pending.append(subclass)
+            self.derived[base_class] = sorted(found, key=self.order.get)
+        return self.derived[base_class]
+
+    def ancestors(self, class_name):
+        """Returns every base of class_name, following bases defined in the project, nearest first."""
+        found = []
+        pending = list(self.bases.get(class_name, ()))
+        while pending:
+            base = pending.pop(0)
+            if base not in found and base != class_name:
+                found.append(base)
+                pending.extend(self.bases.get(base, ()))
+        return found
+
+def find_joinmap_classes(class_defs, index=None):
+    """
+    Returns the classes deriving from JoinMapBaseAdvanced, including those
+    that inherit it through intermediate join map classes.
+    """
+    logging.debug("Finding classes that inherit from 'JoinMapBaseAdvanced'.")
+    if index is None:
+        index = SymbolIndex(class_defs)
+    joinmap_classes = index.derived_classes('JoinMapBaseAdvanced')
+    for class_name in joinmap_classes:
+        logging.debug("Class '%s' is a JoinMap class.", class_name)
+    return joinmap_classes
+
+def resolve_joinmap_files(class_name, file_index, class_files=None):
+    """
+    Returns the files that hold the join map for class_name: the files the
+    symbol index found the class declared in, or failing that a file named
+    after the class.
+    """
+    if class_files and class_name in class_files:
+        logging.debug("Class '%s' defined in: %s", class_name, class_files[class_name])
+        return class_files[class_name]
+    filename = f"{class_name}.cs"
+    if filename in file_index:
+        logging.debug("File found in index: %s", file_index[filename][0])
+        return [file_index[filename][0]]
+    return []
+
+def extract_joinmap_entries(file_content):
+    """
+    Returns every [JoinName] join of the file, in declaration order, with
+    the class declaring it and its number and span as integers. Joins
+    missing a number or type are kept with None in their place so that
+    validate_join_maps can report them.
+    """
+    logging.debug("Extracting join map entries.")
+    # Work on the comment-free code to prevent interference with regex
+    source = lex_csharp(file_content)
+    file_content = source.code
+    # Joins come in file order, as the finder requires
+    find_class = enclosing_class_finder(source)
 
     joinmap_info = []
-    for match in join_pattern.finditer(file_content):
+    position = 0
+    while True:
+        match = PATTERNS["join"].search(file_content, position)
+        if match is None:
+            break
+        class_name = find_class(match.start())
+        # The parameters end at the first ');' after the opening parenthesis.
+        # Without one, no later join can be complete either.
+        params_end = PATTERNS["join_end"].search(file_content, match.end())
+        if params_end is None:
+            logging.debug("Unterminated JoinDataComplete for '%s'.", match.group('join_name'))
+            break
+        position = params_end.end()
         join_name = match.group('join_name')
         property_name = match.group('property_name')
-        join_params = match.group('join_params')
+        join_params = file_content[match.end():params_end.start()]
 
-        logging.debug(f"Processing join '{join_name}' in property '{property_name}'.")
+        logging.debug("Processing join '%s' in property '%s'.", join_name, property_name)
 
         # Extract JoinData and JoinMetadata from join_params
-        join_data_match = re.search(r'new\s+JoinData\s*(?:\(\s*\))?\s*\{(.*?)\}', join_params, re.DOTALL)
-        join_metadata_match = re.search(r'new\s+JoinMetadata\s*(?:\(\s*\))?\s*\{(.*?)\}', join_params, re.DOTALL)
+        join_data_match = PATTERNS["join_data"].search(join_params)
+        join_metadata_match = PATTERNS["join_metadata"].search(join_params)
 
         # Initialize variables
         join_number = None
+        join_span = 1
         description = None
         join_type = None
+        capabilities = None
 
         if join_data_match:
             join_data_content = join_data_match.group(1)
-            join_number_match = re.search(r'JoinNumber\s*=\s*(\d+)', join_data_content)
+            join_number_match = PATTERNS["join_number"].search(join_data_content)
             if join_number_match:
-                join_number = join_number_match.group(1)
-                logging.debug(f"Join number found: {join_number}")
+                join_number = int(join_number_match.group(1))
+                logging.debug("Join number found: %s", join_number)
             else:
-                logging.debug(f"No join number found in join data for '{join_name}'.")
+                logging.debug("No join number found in join data for '%s'.", join_name)
+            join_span_match = PATTERNS["join_span"].search(join_data_content)
+            if join_span_match:
+                join_span = int(join_span_match.group(1))
         else:
-            logging.debug(f"No JoinData found for '{join_name}'.")
+            logging.debug("No JoinData found for '%s'.", join_name)
 
         if join_metadata_match:
             join_metadata_content = join_metadata_match.group(1)
-            description_match = re.search(r'Description\s*=\s*"([^"]+)"', join_metadata_content)
+            description_match = PATTERNS["join_description"].search(join_metadata_content)
             if description_match:
                 description = description_match.group(1)
-                logging.debug(f"Description found: '{description}'")
+                logging.debug("Description found: '%s'", description)
             else:
-                logging.debug(f"No description found in join metadata for '{join_name}'.")
+                logging.debug("No description found in join metadata for '%s'.", join_name)
 
-            join_type_match = re.search(r'JoinType\s*=\s*eJoinType\.(\w+)', join_metadata_content)
+            join_type_match = PATTERNS["join_type"].search(join_metadata_content)
             if join_type_match:
                 join_type = join_type_match.group(1)
-                logging.debug(f"Join type found: {join_type}")
+                logging.debug("Join type found: %s", join_type)
             else:
-                logging.debug(f"No join type found in join metadata for '{join_name}'.")
-        else:
-            logging.debug(f"No JoinMetadata found for '{join_name}'.")
-
-        if join_name and join_number and join_type:
-            logging.debug(f"Adding join '{join_name}' to join map info.")
-            joinmap_info.append({
-                "name": join_name,
-                "join_number": join_number,
-                "type": join_type,
-                "description": description
-            })
+                logging.debug("No join type found in join metadata for '%s'.", join_name)
+
+            capabilities_match = PATTERNS["join_capabilities"].search(join_metadata_content)
+            if capabilities_match:
+                capabilities = capabilities_match.group(1)
+                logging.debug("Join capabilities found: %s", capabilities)
         else:
-            logging.warning(f"Incomplete join information for '{join_name}'. Skipping.")
+            logging.debug("No JoinMetadata found for '%s'.", join_name)
+
+        logging.debug("Adding join '%s' to join map info.", join_name)
+        joinmap_info.append(JoinEntry(join_name, property_name, class_name, join_number, join_span,
+                                      join_type, capabilities, description))
 
     return joinmap_info
 
@@ -306,7 +1430,7 @@ def parse_joinmap_info(class_name, root_directory):
 
 
 def generate_markdown_chart(joins, section_title):
-    logging.debug(f"Generating markdown chart for section '{section_title}'.")
+    logging.debug("Generating markdown chart for section '%s'.", section_title)
     if not joins:
         logging.debug("No joins to include in the chart.")
         return ''
@@ -315,8 +1439,8 @@ def generate_markdown_chart(joins, section_title):
     # Group joins by type
     joins_by_type = {'Digital': [], 'Analog': [], 'Serial': []}
     for join in joins:
-        if join['type'] in joins_by_type:
-            joins_by_type[join['type']].append(join)
+        if join.type in joins_by_type:
+            joins_by_type[join.type].append(join)
         else:
             joins_by_type['Digital'].append(join)  # Default to Digital if type not recognized
 
@@ -326,9 +1450,9 @@ def generate_markdown_chart(joins, section_title):
             markdown_chart += "| Join | Type (RW) | Description |\n"
             markdown_chart += "| --- | --- | --- |\n"
             for join in joins_by_type[join_type]:
-                markdown_chart += f"| {join['join_number']} | R | {join['description']} |\n"
+                markdown_chart += f"| {join.join_number} | R | {join.description} |\n"
             markdown_chart += '\n'
-    logging.debug(f"Markdown chart generated for '{section_title}'.")
+    logging.debug("Markdown chart generated for '%s'.", section_title)
     return markdown_chart
 
 def generate_config_example_markdown(sample_config):
@@ -339,10 +1463,28 @@ def generate_config_example_markdown(sample_config):
     markdown += "\n```\n"
     return markdown
 
+def generate_markdown_class_methods(class_members, section_title):
+    """
+    Lists the public methods of each class under a heading per class, in
+    declaration order. Methods of no recognized class (class name "") come
+    first, without a heading.
+    """
+    logging.debug("Generating public methods by class for section '%s'.", section_title)
+    markdown = ''
+    for class_name, members in sorted(class_members.items(), key=lambda item: item[0] != ""):
+        methods = remove_duplicates_preserve_order([member.signature for member in members if member.kind == "method"])
+        if methods:
+            heading = f"#### {class_name}\n\n" if class_name else ""
+            markdown += heading + "".join(f"- {method}\n" for method in methods) + "\n"
+    if not markdown:
+        logging.debug("No public methods to include in section '%s'.", section_title)
+        return ''
+    return f'### {section_title}\n\n' + markdown
+
 def generate_markdown_list(items, section_title):
-    logging.debug(f"Generating markdown list for section '{section_title}'.")
+    logging.debug("Generating markdown list for section '%s'.", section_title)
     if not items:
-        logging.debug(f"No items to include in section '{section_title}'.")
+        logging.debug("No items to include in section '%s'.", section_title)
         return ''
     markdown = f'### {section_title}\n\n'
     for item in items:
@@ -350,253 +1492,1246 @@ def generate_markdown_list(items, section_title):
     markdown += '\n'
     return markdown
 
-def parse_all_classes(directory):
-    logging.debug(f"Parsing all classes in directory: {directory}")
-    class_defs = {}
-    class_pattern = re.compile(
-        r'^\s*(?:\[[^\]]+\]\s*)*'      # Optional attributes
-        r'(?:public\s+|private\s+|protected\s+)?'  # Access modifier
-        r'(?:partial\s+)?'                # Optional 'partial' keyword
-        r'class\s+([A-Za-z_]\w*)'       # Class name
-        r'(?:\s*:\s*[^\{]+)?'           # Optional inheritance
-        r'\s*\{',                       # Opening brace
-        re.MULTILINE
-    )
-    property_pattern = re.compile(
-        r'^\s*'
-        r'(?:\[[^\]]*\]\s*)*'              # Optional attributes
-        r'(?:public|private|protected)\s+'  # Access modifier
-        r'(?:static\s+|virtual\s+|override\s+|abstract\s+|readonly\s+)?'  # Optional modifiers
-        r'([A-Za-z0-9_<>,\s\[\]\?]+?)\s+'     # Type
-        r'([A-Za-z_]\w*)\s*'                # Property name
-        r'\{[^}]*?\}',                      # Property body
-        re.MULTILINE | re.DOTALL
-    )
-    for root, _, files in os.walk(directory):
-        logging.debug(f"Entering directory: {root}")
-        for file in files:
-            if file.endswith('.cs'):
-                file_path = os.path.join(root, file)
-                logging.debug(f"Processing file: {file_path}")
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Find all class definitions
-                    for class_match in class_pattern.finditer(content):
-                        class_name = class_match.group(1)
-                        logging.debug(f"Class found: {class_name}")
-                        class_start = class_match.end()
-                        # Find the matching closing brace for the class
-                        class_body, end_index = extract_class_body(content, class_start)
-                        # Parse properties within the class body
-                        properties = []
-                        for prop_match in property_pattern.finditer(class_body):
-                            prop_string = prop_match.group(0)
-                            json_property_match = re.search(r'\[JsonProperty\("([^"]+)"\)\]', prop_string)
-                            json_property_name = json_property_match.group(1) if json_property_match else None
-                            prop_type = prop_match.group(1).strip()
-                            prop_name = prop_match.group(2)
-                            properties.append({
-                                "json_property_name": json_property_name if json_property_name else prop_name,
-                                "property_name": prop_name,
-                                "property_type": prop_type
-                            })
-                            logging.debug(f"Property found in class '{class_name}': {prop_name} ({prop_type})")
-                        class_defs[class_name] = properties
-    logging.debug("Finished parsing all classes.")
-    return class_defs
+SAMPLE_PRIMITIVES = {
+    'int': 0, 'long': 0, 'float': 0, 'double': 0, 'decimal': 0,
+    'string': "SampleString",
+    'bool': True,
+    'DateTime': "2021-01-01T00:00:00Z"
+}
+SAMPLE_LIST_PREFIXES = ('List<', 'IList<', 'IEnumerable<', 'ObservableCollection<')
 
-def extract_class_body(content, start_index):
-    logging.debug(f"Extracting class body starting at index {start_index}.")
-    """
-    Extracts the body of a class from the content, starting at start_index.
-    Returns the class body and the index where it ends.
-    """
-    brace_count = 1
-    index = start_index
-    while brace_count > 0 and index < len(content):
-        if content[index] == '{':
-            brace_count += 1
-        elif content[index] == '}':
-            brace_count -= 1
-        index += 1
-    class_body = content[start_index:index - 1]
-    logging.debug(f"Class body extracted. Length: {len(class_body)} characters.")
-    return class_body, index - 1
-
-def generate_sample_value(property_type, class_defs, processed_classes=None):
-    if processed_classes is None:
-        processed_classes = set()
-    property_type = property_type.strip()
+def resolve_sample_type(property_type, class_defs):
+    """
+    Classifies a property type for sample generation. Returns one of
+    ('primitive', value), ('list', inner_type), ('dict', key_type, value_type),
+    ('class', class_name) or ('unknown', property_type).
+    """
     # Handle nullable types
-    property_type = property_type.rstrip('?')
-    logging.debug(f"Generating sample value for type '{property_type}'.")
-    # Handle primitive types
-    if property_type in ('int', 'long', 'float', 'double', 'decimal'):
-        return 0
-    elif property_type == 'string':
-        return "SampleString"
-    elif property_type == 'bool':
-        return True
-    elif property_type == 'DateTime':
-        return "2021-01-01T00:00:00Z"
+    property_type = property_type.strip().rstrip('?')
+    if property_type in SAMPLE_PRIMITIVES:
+        return ('primitive', SAMPLE_PRIMITIVES[property_type])
     # Handle collections
-    elif property_type.startswith('List<') or property_type.startswith('IList<') or property_type.startswith('IEnumerable<') or property_type.startswith('ObservableCollection<'):
-        inner_type = property_type[property_type.find('<')+1:-1]
-        return [generate_sample_value(inner_type, class_defs, processed_classes)]
+    elif property_type.startswith(SAMPLE_LIST_PREFIXES):
+        return ('list', property_type[property_type.find('<')+1:-1])
     elif property_type.startswith('Dictionary<'):
         types = property_type[property_type.find('<')+1:-1].split(',')
-        key_type = types[0].strip()
-        value_type = types[1].strip()
-        key_sample = generate_sample_value(key_type, class_defs, processed_classes)
-        value_sample = generate_sample_value(value_type, class_defs, processed_classes)
-        return { key_sample: value_sample }
+        return ('dict', types[0].strip(), types[1].strip())
     # Handle custom classes
     elif property_type in class_defs:
-        if property_type in processed_classes:
-            logging.debug(f"Already processed class '{property_type}', avoiding recursion.")
+        return ('class', property_type)
+    return ('unknown', property_type)
+
+class SampleValueGenerator:
+    """
+    Generates sample values for config property types.
+    The custom classes in class_defs are resolved once into a dependency
+    graph. A class that is not on a cycle expands the same way wherever it
+    appears, so its sample is built once and reused; classes on a cycle are
+    expanded along the current path and cut with {} where they would recurse.
+    Expansion also stops, with {}, below max_depth nested classes and once
+    max_values values have been generated.
+    """
+
+    def __init__(self, class_defs, max_depth=None, max_values=None):
+        self.class_defs = class_defs
+        self.max_depth = SAMPLE_MAX_DEPTH if max_depth is None else max_depth
+        self.max_values = SAMPLE_MAX_VALUES if max_values is None else max_values
+        self.types = {}
+        self.dependencies = {
+            class_name: self.class_dependencies(properties)
+            for class_name, properties in class_defs.items()
+        }
+        self.cyclic = self.find_cyclic_classes()
+        # class name -> (sample, values, depth) for complete samples, and
+        # (class name, remaining depth) -> the same for samples cut by depth
+        self.samples = {}
+        self.cut_samples = {}
+        self.values = 0
+        self.truncated = 0
+        # Longest path, in nested classes, reached by the expansion so far
+        self.deepest = 0
+
+    def resolve(self, property_type):
+        resolved = self.types.get(property_type)
+        if resolved is None:
+            resolved = self.types[property_type] = resolve_sample_type(property_type, self.class_defs)
+        return resolved
+
+    def class_dependencies(self, properties):
+        """Returns the custom classes reachable through one class's property types."""
+        dependencies = []
+        pending = [prop.property_type for prop in properties]
+        while pending:
+            resolved = self.resolve(pending.pop())
+            if resolved[0] == 'class':
+                if resolved[1] not in dependencies:
+                    dependencies.append(resolved[1])
+            elif resolved[0] in ('list', 'dict'):
+                pending.extend(resolved[1:])
+        return dependencies
+
+    def find_cyclic_classes(self):
+        """Returns the classes that can reach themselves (Tarjan's SCC algorithm, iterative)."""
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        cyclic = set()
+        for root in self.dependencies:
+            if root in index:
+                continue
+            work = [(root, iter(self.dependencies[root]))]
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.dependencies[child])))
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.dependencies[node]:
+                            cyclic.update(component)
+        return cyclic
+
+    def generate(self, property_type, processed_classes=None):
+        """Returns a sample value for property_type; processed_classes are treated as already on the path."""
+        path = list(processed_classes or ())
+        return self.generate_value(property_type, path, set(path))
+
+    def generate_value(self, property_type, path, on_path):
+        logging.debug("Generating sample value for type '%s'.", property_type)
+        if PROFILER is not None:
+            PROFILER.count("generate_sample_value")
+        self.values += 1
+        resolved = self.resolve(property_type)
+        kind = resolved[0]
+        if kind == 'primitive':
+            return resolved[1]
+        elif kind == 'list':
+            return [self.generate_value(resolved[1], path, on_path)]
+        elif kind == 'dict':
+            key_sample = self.generate_value(resolved[1], path, on_path)
+            value_sample = self.generate_value(resolved[2], path, on_path)
+            return { key_sample: value_sample }
+        elif kind == 'class':
+            return self.generate_class(resolved[1], path, on_path)
+        # Unknown type, default to a sample value
+        logging.debug("Unknown type '%s', using default sample value.", property_type)
+        return "SampleValue"
+
+    def generate_class(self, class_name, path, on_path):
+        if class_name in on_path:
+            logging.debug("Already processed class '%s', avoiding recursion.", class_name)
+            return {}
+        remaining = self.max_depth - len(path)
+        if remaining <= 0 or self.values > self.max_values:
+            logging.debug("Sample depth or size limit reached at class '%s'.", class_name)
+            self.truncated += 1
             return {}
-        logging.debug(f"Processing custom class '{property_type}'.")
-        processed_classes.add(property_type)
-        properties = class_defs[property_type]
+
+        reusable = class_name not in self.cyclic
+        if reusable:
+            cached = self.samples.get(class_name)
+            if cached is None or cached[2] > remaining:
+                cached = self.cut_samples.get((class_name, remaining))
+            if cached is not None and self.values + cached[1] <= self.max_values:
+                if PROFILER is not None:
+                    PROFILER.count("sample_value_reused")
+                self.values += cached[1]
+                self.deepest = max(self.deepest, len(path) + cached[2])
+                return cached[0]
+
+        logging.debug("Processing custom class '%s'.", class_name)
+        values_before, truncated_before, outer_deepest = self.values, self.truncated, self.deepest
+        path.append(class_name)
+        on_path.add(class_name)
+        self.deepest = len(path)
         sample_obj = {}
-        for prop in properties:
-            prop_name = prop['json_property_name']
-            prop_type = prop['property_type']
-            sample_obj[prop_name] = generate_sample_value(prop_type, class_defs, processed_classes)
-        processed_classes.remove(property_type)
+        for prop in self.class_defs[class_name]:
+            sample_obj[prop.json_property_name] = self.generate_value(prop.property_type, path, on_path)
+        path.pop()
+        on_path.discard(class_name)
+        depth = self.deepest - len(path)
+        self.deepest = max(outer_deepest, self.deepest)
+
+        if reusable:
+            sample = (sample_obj, self.values - values_before, depth)
+            if self.truncated == truncated_before:
+                self.samples[class_name] = sample
+            elif self.values <= self.max_values:
+                # Cut only by depth, so valid wherever the same depth remains
+                self.cut_samples[(class_name, remaining)] = sample
         return sample_obj
-    else:
-        # Unknown type, default to a sample value
-        logging.debug(f"Unknown type '{property_type}', using default sample value.")
-        return "SampleValue"
 
-def generate_sample_config(config_class_name, class_defs, supported_types):
-    logging.debug(f"Generating sample config for class '{config_class_name}'.")
+def sample_config_type(config_class_name, supported_types):
     type_name = config_class_name[:-6]  # Remove 'Config'
     if type_name not in supported_types:
         type_name = supported_types[0] if supported_types else type_name
+    return type_name
+
+def reachable_config_classes(config_class_name, class_defs):
+    """
+    Returns {class_name: [(json_property_name, property_type), ...]} for
+    config_class_name and every custom class reachable through its property
+    types: exactly the part of class_defs its sample config is built from.
+    """
+    reachable = {}
+    pending = [config_class_name]
+    while pending:
+        resolved = resolve_sample_type(pending.pop(), class_defs)
+        if resolved[0] in ('list', 'dict'):
+            pending.extend(resolved[1:])
+        elif resolved[0] == 'class' and resolved[1] not in reachable:
+            properties = class_defs[resolved[1]]
+            reachable[resolved[1]] = [(prop.json_property_name, prop.property_type) for prop in properties]
+            pending.extend(prop.property_type for prop in properties)
+    return reachable
+
+def generate_sample_config(config_class_name, class_defs, supported_types, max_depth=None, max_values=None):
+    logging.debug("Generating sample config for class '%s'.", config_class_name)
+    generator = SampleValueGenerator(class_defs, max_depth, max_values)
     config = {
         "key": "GeneratedKey",
         "uid": 1,
         "name": "GeneratedName",
-        "type": type_name,
+        "type": sample_config_type(config_class_name, supported_types),
         "group": "Group",
-        "properties": generate_sample_value(config_class_name, class_defs)
+        "properties": generator.generate(config_class_name)
     }
-    logging.debug(f"Sample config generated: {config}")
+    if generator.truncated:
+        logging.warning("Config example for '%s' was cut at %s nested classes or %s values.",
+                        config_class_name, generator.max_depth, generator.max_values)
     return config
 
 def read_readme_file(filepath):
-    logging.debug(f"Reading README file at: {filepath}")
+    logging.debug("Reading README file at: %s", filepath)
     if not os.path.exists(filepath):
-        logging.warning(f"README.md file not found at {filepath}. A new file will be created.")
+        logging.warning("README.md file not found at %s. A new file will be created.", filepath)
         return ""
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
         logging.debug("README.md file content successfully read.")
         return content
 
-def update_readme_section(readme_content, section_title, new_section_content):
-    logging.debug(f"Updating README section '{section_title}'.")
-    start_marker = f'<!-- START {section_title} -->'
-    end_marker = f'<!-- END {section_title} -->'
+def section_digest(section_title, inputs):
+    """
+    Returns the content hash written into a section's START marker: a digest
+    of the section title and of everything the section is rendered from.
+    """
+    data = json.dumps([README_FORMAT_VERSION, section_title, inputs], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+def format_section(section_title, content, digest=None):
+    start = f'<!-- START {section_title} sha256:{digest} -->' if digest else f'<!-- START {section_title} -->'
+    return f'{start}\n{content.rstrip()}\n<!-- END {section_title} -->'
+
+def splice_readme_sections(readme_content, sections):
+    """
+    Replaces every section in one pass over the README.
+    sections is a list of (section_title, new_section_content) pairs or
+    (section_title, new_section_content, digest) triples. The first
+    '<!-- START title -->...<!-- END title -->' block of each title is
+    replaced unless it contains '<!-- SKIP -->'; titles with no block are
+    appended in the order given.
+    With a digest the START marker carries it as 'sha256:<digest>', and a
+    block whose marker already holds the same digest is left as it is.
+    The content may then be a function returning it, which is only called
+    for sections whose digest changed, so unchanged sections are not
+    rendered at all. A hashed block whose rendered content is the same as
+    before is left as it is too, rather than rewritten for its marker.
+    A START marker with no matching END marker is logged as an error and
+    the README is returned unchanged.
+    """
+    new_contents = {}
+    for section_title, new_section_content, *digest in sections:
+        new_contents.setdefault(section_title.lower(), (section_title, new_section_content, digest[0] if digest else None))
 
     pattern = re.compile(
-        rf'{re.escape(start_marker)}(.*?){re.escape(end_marker)}',
+        r'<!-- START (?P<title>' + '|'.join(re.escape(title) for title, _, _ in new_contents.values()) + r')'
+        r'(?: sha256:(?P<digest>[0-9a-f]+))? -->'
+        r'(?P<body>.*?)<!-- END (?P=title) -->',
         re.DOTALL | re.IGNORECASE
     )
 
-    match = pattern.search(readme_content)
+    def render(content):
+        return content() if callable(content) else content
 
-    if match:
-        section_content = match.group(1)
-        if '<!-- SKIP -->' in section_content:
-            logging.info(f"Skipping section: {section_title} (found <!-- SKIP -->)")
-            return readme_content  # Return the original content unchanged
-        else:
-            logging.debug(f"Updating existing section: {section_title}")
-            updated_section = f'{start_marker}\n{new_section_content.rstrip()}\n{end_marker}'
-            updated_readme = readme_content[:match.start()] + updated_section + readme_content[match.end():]
-    else:
-        logging.debug(f"Adding new section: {section_title}")
-        # Ensure there's a newline before adding the new section
+    pieces = []
+    last_end = 0
+    found = set()
+    for match in pattern.finditer(readme_content):
+        key = match.group('title').lower()
+        if key in found:
+            continue
+        found.add(key)
+        section_title, new_section_content, digest = new_contents[key]
+        if '<!-- SKIP -->' in match.group('body'):
+            logging.info("Skipping section: %s (found <!-- SKIP -->)", section_title)
+            continue
+        if digest and match.group('digest') == digest:
+            logging.debug("Section unchanged: %s", section_title)
+            continue
+        content = render(new_section_content)
+        if digest and match.group('digest') and match.group('body') == f'\n{content.rstrip()}\n':
+            # Only the marker would change; leave the README as it is
+            logging.debug("Section content unchanged: %s", section_title)
+            continue
+        logging.debug("Updating existing section: %s", section_title)
+        pieces.append(readme_content[last_end:match.start()])
+        pieces.append(format_section(section_title, content, digest))
+        last_end = match.end()
+    pieces.append(readme_content[last_end:])
+
+    missing = [section for key, section in new_contents.items() if key not in found]
+    unterminated = [
+        section_title for section_title, _, _ in missing
+        if re.search(r'<!-- START ' + re.escape(section_title) + r'(?: sha256:[0-9a-f]+)? -->', readme_content,
+                     re.IGNORECASE)
+    ]
+    if unterminated:
+        # Appending would leave the open block and a second copy of it
+        logging.error("README.md has a START marker without an END marker for: %s. Leaving it untouched.",
+                      ", ".join(unterminated))
+        return readme_content
+    if missing:
+        # Ensure there's a newline before adding the new sections
         if not readme_content.endswith('\n'):
-            readme_content += '\n'
-        updated_section = f'{start_marker}\n{new_section_content.rstrip()}\n{end_marker}\n'
-        updated_readme = readme_content + updated_section
-    return updated_readme
+            pieces.append('\n')
+        for section_title, new_section_content, digest in missing:
+            logging.debug("Adding new section: %s", section_title)
+            pieces.append(format_section(section_title, render(new_section_content), digest) + '\n')
+    return ''.join(pieces)
+
+def file_differs(filepath, content):
+    """Returns True if filepath is missing or its bytes differ from content encoded as UTF-8."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read() != content.encode('utf-8')
+    except FileNotFoundError:
+        return True
+
+def read_umask():
+    """
+    Returns the process umask. Linux reports it in /proc; elsewhere it can
+    only be read by setting it, which is safe only before any thread starts.
+    """
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Read once at import, while the process is still single-threaded; new
+# files get the permissions open() would give them.
+UMASK = read_umask()
+
+def write_file_if_changed(filepath, content):
+    """
+    Writes content to filepath only when the bytes differ from what is on
+    disk. The file is replaced atomically through a temporary file in the
+    same directory, keeping its permissions.
+    Returns True when the file was written.
+    """
+    if not file_differs(filepath, content):
+        return False
+    data = content.encode('utf-8')
+    try:
+        mode = os.stat(filepath).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(prefix='.readme-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return True
 
 def remove_duplicates_preserve_order(seq):
     logging.debug("Removing duplicates while preserving order.")
     seen = set()
     unique_list = [x for x in seq if not (x in seen or seen.add(x))]
-    logging.debug(f"Unique items: {unique_list}")
+    logging.debug("Kept %s of %s items.", len(unique_list), len(seq))
     return unique_list
 
-if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1:
-        project_directory = os.path.abspath(sys.argv[1])
-    else:
-        project_directory = os.path.abspath("./")
-    
-    logging.info(f"Starting processing in project directory: {project_directory}")
-    results = read_files_in_directory(project_directory)
+def configure_logging(level_name=None):
+    """
+    Configures the root logger from level_name, falling back to
+    $METADATA_LOG_LEVEL and then DEFAULT_LOG_LEVEL.
+    """
+    level_name = (level_name or os.environ.get(LOG_LEVEL_ENV) or DEFAULT_LOG_LEVEL).upper()
+    level = logging.getLevelName(level_name)
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {level_name}")
+    logging.basicConfig(level=level, force=True)
 
-    # Remove duplicates from interfaces and base classes while preserving order
-    unique_interfaces = remove_duplicates_preserve_order(results["interfaces"])
-    unique_base_classes = remove_duplicates_preserve_order(results["base_classes"])
-
-    # Generate markdown sections with titles using the deduplicated lists
-    interfaces_markdown = generate_markdown_list(unique_interfaces, "Interfaces Implemented")
-    base_classes_markdown = generate_markdown_list(unique_base_classes, "Base Classes")
-    supported_types_markdown = generate_markdown_list(results["supported_types"], "Supported Types")
-    minimum_versions_markdown = generate_markdown_list(results["minimum_versions"], "Minimum Essentials Framework Versions")
-    public_methods_markdown = generate_markdown_list(results["public_methods"], "Public Methods")
-    bool_feedbacks_markdown = generate_markdown_list(results["feedbacks"]["bool_feedbacks"], "Bool Feedbacks")
-    int_feedbacks_markdown = generate_markdown_list(results["feedbacks"]["int_feedbacks"], "Int Feedbacks")
-    string_feedbacks_markdown = generate_markdown_list(results["feedbacks"]["string_feedbacks"], "String Feedbacks")
-
-    # Generate Join Maps markdown
-    class_defs = read_class_names_and_bases_from_files(project_directory)
-    joinmap_classes = find_joinmap_classes(class_defs)
+def count_public_methods(model):
+    return sum(1 for members in model["class_members"].values() for member in members if member.kind == "method")
+
+def log_summary(model, config_class_count):
+    feedbacks = model["feedbacks"]
+    logging.info(
+        "Summary: %s files, %s interfaces, %s base classes, %s supported types, %s minimum versions, "
+        "%s public methods, %s/%s/%s bool/int/string feedbacks, %s config classes, %s joins.",
+        model["file_count"], len(model["interfaces"]), len(model["base_classes"]),
+        len(model["supported_types"]), len(model["minimum_versions"]), count_public_methods(model),
+        len(feedbacks["bool_feedbacks"]), len(feedbacks["int_feedbacks"]), len(feedbacks["string_feedbacks"]),
+        config_class_count, len(model["joins"])
+    )
+
+def collect_joinmap_info(scan, index=None):
+    if index is None:
+        index = SymbolIndex(scan["class_defs"], scan["class_files"])
+    joinmap_classes = find_joinmap_classes(scan["class_defs"], index)
     joinmap_info = []
     for cls in joinmap_classes:
-        info = parse_joinmap_info(cls, project_directory)
-        joinmap_info.extend(info)
-    join_maps_markdown = generate_markdown_chart(joinmap_info, "Join Maps")
-
-    # Generate Config Example markdown
-    all_class_defs = parse_all_classes(project_directory)
-    config_classes = [cls for cls in all_class_defs if cls.endswith('Config') or cls.endswith('ConfigObject')]
-    if not config_classes:
-        logging.warning("No config classes found.")
-        config_example_markdown = ""
+        file_paths = resolve_joinmap_files(cls, scan["file_index"], index.files)
+        if not file_paths:
+            logging.warning("File not found: %s.cs. Skipping...", cls)
+        # A file may hold other classes' joins too; take only this map's own
+        for file_path in file_paths:
+            joinmap_info.extend(
+                join for join in scan["file_joins"].get(file_path, [])
+                if join.class_name == cls and is_complete_join(join)
+            )
+    return joinmap_info
+
+def is_complete_join(join):
+    return join.join_number is not None and join.type is not None
+
+# The signal types each eJoinType occupies; a DigitalSerial join uses its
+# numbers in both the digital and the serial join space.
+JOIN_TYPE_SIGNALS = {
+    "Digital": ("Digital",),
+    "Analog": ("Analog",),
+    "Serial": ("Serial",),
+    "DigitalAnalog": ("Digital", "Analog"),
+    "DigitalSerial": ("Digital", "Serial"),
+    "AnalogSerial": ("Analog", "Serial"),
+    "DigitalAnalogSerial": ("Digital", "Analog", "Serial"),
+}
+
+# The directions each eJoinCapabilities value uses. A join SIMPL only reads
+# and a join it only drives may share a number, so ranges are checked per
+# direction; joins without capabilities are checked in both.
+JOIN_CAPABILITY_DIRECTIONS = {
+    "None": (),
+    "ToSIMPL": ("ToSIMPL",),
+    "FromSIMPL": ("FromSIMPL",),
+    "ToFromSIMPL": ("ToSIMPL", "FromSIMPL"),
+}
+
+def format_join_range(start, end):
+    return str(start) if start == end else f"{start}-{end}"
+
+def find_join_overlaps(intervals):
+    """
+    Sweeps (start, end, join, owner) intervals of one signal type in start
+    order. Returns the (join, earlier_join) pairs whose ranges intersect,
+    pairing each join with the earlier one reaching furthest, and the
+    unused ranges between joins.
+    """
+    intervals.sort(key=lambda interval: (interval[0], interval[1]))
+    overlaps = []
+    gaps = []
+    reach = None
+    for interval in intervals:
+        start, end = interval[0], interval[1]
+        if reach is not None:
+            if start <= reach[1]:
+                overlaps.append((interval, reach))
+            elif start > reach[1] + 1:
+                gaps.append((reach[1] + 1, start - 1))
+        if reach is None or end > reach[1]:
+            reach = interval
+    return overlaps, gaps
+
+def validate_join_maps(scan, index=None):
+    """
+    Checks every join map class together with the joins it inherits from
+    other join maps of the project. Errors are joins without a number or
+    type, join names used twice, joins hiding an inherited one and joins
+    whose JoinNumber..JoinNumber+JoinSpan-1 ranges collide within a signal
+    type and direction. Unused ranges are reported for join maps no other
+    map derives from. Returns the issues as dicts with severity, class,
+    join and message, each also logged at its severity.
+    """
+    if index is None:
+        index = SymbolIndex(scan["class_defs"], scan["class_files"])
+    joinmap_classes = find_joinmap_classes(scan["class_defs"], index)
+    own_joins = {class_name: [] for class_name in joinmap_classes}
+    for joins in scan["file_joins"].values():
+        for join in joins:
+            if join.class_name in own_joins:
+                own_joins[join.class_name].append(join)
+
+    issues = []
+
+    def report(severity, class_name, join_name, message, *args):
+        message = message % args
+        getattr(logging, severity)("Join map '%s': %s", class_name, message)
+        issues.append({"severity": severity, "class": class_name, "join": join_name, "message": message})
+
+    for class_name in joinmap_classes:
+        joins = []
+        for join in own_joins[class_name]:
+            if is_complete_join(join):
+                joins.append((join, class_name))
+            else:
+                missing = " and ".join(field for field, value in (("JoinNumber", join.join_number),
+                                                                  ("JoinType", join.type)) if value is None)
+                report("error", class_name, join.name, "join '%s' has no %s.", join.name, missing)
+
+        # Inherited joins, nearest map first; a field redeclared in a derived
+        # map hides the inherited one, which is then left out of the ranges
+        properties = {join.property: owner for join, owner in joins}
+        for ancestor in index.ancestors(class_name):
+            for join in own_joins.get(ancestor, ()):
+                if not is_complete_join(join):
+                    continue
+                if join.property in properties:
+                    if properties[join.property] == class_name:
+                        report("error", class_name, join.name, "field '%s' hides the join '%s' inherited from '%s'.",
+                               join.property, join.name, ancestor)
+                    continue
+                properties[join.property] = ancestor
+                joins.append((join, ancestor))
+
+        names = {}
+        intervals = {}
+        for join, owner in joins:
+            earlier = names.setdefault(join.name, (join, owner))
+            if earlier[0] is not join and class_name in (owner, earlier[1]):
+                report("error", class_name, join.name, "join name '%s' is used by both '%s' and '%s'.",
+                       join.name, earlier[0].property, join.property)
+            signals = JOIN_TYPE_SIGNALS.get(join.type)
+            if signals is None:
+                if owner == class_name:
+                    report("warning", class_name, join.name, "join '%s' has unknown type '%s'; checked as Digital.",
+                           join.name, join.type)
+                signals = ("Digital",)
+            directions = JOIN_CAPABILITY_DIRECTIONS.get(join.capabilities, ("ToSIMPL", "FromSIMPL"))
+            start = join.join_number
+            end = start + max(join.join_span, 1) - 1
+            for signal in signals:
+                intervals.setdefault(signal, []).append((start, end, join, owner))
+                for direction in directions:
+                    intervals.setdefault((signal, direction), []).append((start, end, join, owner))
+
+        for signal in ("Digital", "Analog", "Serial"):
+            overlaps = []
+            for direction in ("ToSIMPL", "FromSIMPL"):
+                overlaps.extend(find_join_overlaps(intervals.get((signal, direction), []))[0])
+            # Gaps are ranges no join uses in either direction
+            gaps = find_join_overlaps(intervals.get(signal, []))[1]
+            reported = set()
+            for (start, end, join, owner), (other_start, other_end, other, other_owner) in overlaps:
+                # Collisions between inherited joins only are reported for the map declaring them
+                if class_name not in (owner, other_owner):
+                    continue
+                # Two ToFromSIMPL joins collide in both directions; report them once
+                if (join, other) in reported:
+                    continue
+                reported.add((join, other))
+                if start == other_start:
+                    report("error", class_name, join.name, "%s join %s of '%s' duplicates '%s'%s.",
+                           signal, start, join.name, other.name,
+                           "" if other_owner == class_name else f" inherited from '{other_owner}'")
+                else:
+                    report("error", class_name, join.name, "%s joins %s of '%s' overlap %s of '%s'%s.",
+                           signal, format_join_range(start, end), join.name,
+                           format_join_range(other_start, other_end), other.name,
+                           "" if other_owner == class_name else f" inherited from '{other_owner}'")
+            if gaps and not any(subclass in own_joins for subclass in index.derived_classes(class_name)):
+                report("info", class_name, None, "%s joins %s are unused.",
+                       signal, ", ".join(format_join_range(start, end) for start, end in gaps))
+    return issues
+
+def build_metadata_model(scan):
+    """
+    Aggregates a scan result into the metadata model the README renderer
+    works from. The model is plain JSON data, so it can be saved with
+    --snapshot and rendered later without re-parsing the sources.
+    """
+    results = scan["results"]
+    with profile_phase("join_maps"):
+        index = SymbolIndex(scan["class_defs"], scan["class_files"])
+        joins = collect_joinmap_info(scan, index)
+    with profile_phase("join_validation"):
+        join_issues = validate_join_maps(scan, index)
+    return {
+        "schema": MODEL_SCHEMA_VERSION,
+        "file_count": scan["file_count"],
+        "interfaces": results["interfaces"],
+        "base_classes": results["base_classes"],
+        "supported_types": results["supported_types"],
+        "minimum_versions": results["minimum_versions"],
+        "class_members": scan["class_members"],
+        "feedbacks": results["feedbacks"],
+        "joins": joins,
+        "join_issues": join_issues,
+        "class_properties": scan["all_class_defs"]
+    }
+
+def build_readme_sections(model):
+    """
+    Prepares every generated README section from a metadata model.
+    Returns the (section_title, render, digest) triples in update order,
+    where render returns the section's markdown and digest hashes what it
+    is rendered from, and the number of config classes found. Sections are
+    rendered by splice_readme_sections only when their digest changed.
+    """
+    # Remove duplicates from interfaces and base classes while preserving order
+    unique_interfaces = remove_duplicates_preserve_order(model["interfaces"])
+    unique_base_classes = remove_duplicates_preserve_order(model["base_classes"])
+    feedbacks = model["feedbacks"]
+    public_methods = {
+        class_name: [member for member in members if member.kind == "method"]
+        for class_name, members in model["class_members"].items()
+    }
+
+    # Find the Config Example's main class
+    all_class_defs = model["class_properties"]
+    property_counts = {
+        cls: len(properties) for cls, properties in all_class_defs.items()
+        if cls.endswith('Config') or cls.endswith('ConfigObject')
+    }
+    main_config_class = max(property_counts, key=property_counts.get) if property_counts else None
+
+    def config_example_markdown():
+        with profile_phase("config_sample"):
+            sample_config = generate_sample_config(main_config_class, all_class_defs, model["supported_types"])
+        return generate_config_example_markdown(sample_config)
+
+    # (section_title, what the section is rendered from, renderer). The
+    # inputs hold only what ends up in the markdown, so a change elsewhere
+    # in the model leaves the section's digest, and the README, unchanged.
+    definitions = [
+        ("Minimum Essentials Framework Versions", model["minimum_versions"],
+         lambda: generate_markdown_list(model["minimum_versions"], "Minimum Essentials Framework Versions"))
+    ]
+    if main_config_class:
+        definitions.append(("Config Example",
+                            [main_config_class, sample_config_type(main_config_class, model["supported_types"]),
+                             reachable_config_classes(main_config_class, all_class_defs),
+                             SAMPLE_MAX_DEPTH, SAMPLE_MAX_VALUES],
+                            config_example_markdown))
     else:
-        main_config_class = max(config_classes, key=lambda cls: len(all_class_defs[cls]))
-        sample_config = generate_sample_config(main_config_class, all_class_defs, results["supported_types"])
-        config_example_markdown = generate_config_example_markdown(sample_config)
+        logging.warning("No config classes found.")
+    definitions.extend([
+        ("Supported Types", model["supported_types"],
+         lambda: generate_markdown_list(model["supported_types"], "Supported Types")),
+        ("Join Maps", [(join.type, join.join_number, join.description) for join in model["joins"]],
+         lambda: generate_markdown_chart(model["joins"], "Join Maps")),
+        ("Interfaces Implemented", unique_interfaces,
+         lambda: generate_markdown_list(unique_interfaces, "Interfaces Implemented")),
+        ("Base Classes", unique_base_classes,
+         lambda: generate_markdown_list(unique_base_classes, "Base Classes")),
+        ("Public Methods",
+         {class_name: [member.signature for member in members] for class_name, members in public_methods.items()},
+         lambda: generate_markdown_class_methods(public_methods, "Public Methods")),
+        ("Bool Feedbacks", feedbacks["bool_feedbacks"],
+         lambda: generate_markdown_list(feedbacks["bool_feedbacks"], "Bool Feedbacks")),
+        ("Int Feedbacks", feedbacks["int_feedbacks"],
+         lambda: generate_markdown_list(feedbacks["int_feedbacks"], "Int Feedbacks")),
+        ("String Feedbacks", feedbacks["string_feedbacks"],
+         lambda: generate_markdown_list(feedbacks["string_feedbacks"], "String Feedbacks"))
+    ])
+    sections = [
+        (section_title, render, section_digest(section_title, inputs))
+        for section_title, inputs, render in definitions
+    ]
+    return sections, len(property_counts)
+
+def update_readme(project_directory, model, check=False):
+    """
+    Splices the sections rendered from model into the project's README.md.
+    Returns True when README.md was written, or with check, when it would
+    be: README.md is then left untouched.
+    """
+    sections, config_class_count = build_readme_sections(model)
 
     # Read the existing README.md content
     readme_path = os.path.join(project_directory, 'README.md')
     readme_content = read_readme_file(readme_path)
 
-    # Update or insert sections with section titles handled in the content
-    readme_content = update_readme_section(readme_content, "Minimum Essentials Framework Versions", minimum_versions_markdown)
-    if config_example_markdown:
-        readme_content = update_readme_section(readme_content, "Config Example", config_example_markdown)
-    readme_content = update_readme_section(readme_content, "Supported Types", supported_types_markdown)
-    readme_content = update_readme_section(readme_content, "Join Maps", join_maps_markdown)
-    readme_content = update_readme_section(readme_content, "Interfaces Implemented", interfaces_markdown)
-    readme_content = update_readme_section(readme_content, "Base Classes", base_classes_markdown)
-    readme_content = update_readme_section(readme_content, "Public Methods", public_methods_markdown)
-    readme_content = update_readme_section(readme_content, "Bool Feedbacks", bool_feedbacks_markdown)
-    readme_content = update_readme_section(readme_content, "Int Feedbacks", int_feedbacks_markdown)
-    readme_content = update_readme_section(readme_content, "String Feedbacks", string_feedbacks_markdown)
-
-    # Write the updated content back to README.md
-    with open(readme_path, 'w', encoding='utf-8') as f:
-        f.write(readme_content)
+    with profile_phase("readme_splice"):
+        # Update or insert sections with section titles handled in the content
+        new_readme_content = splice_readme_sections(readme_content, sections)
+
+        if check:
+            updated = file_differs(readme_path, new_readme_content)
+        else:
+            # Write the updated content back to README.md
+            updated = write_file_if_changed(readme_path, new_readme_content)
+    if check:
+        logging.info("README.md would be updated." if updated else "README.md is up to date.")
+    elif updated:
         logging.info("README.md has been updated.")
+    else:
+        logging.info("README.md is already up to date.")
+    log_summary(model, config_class_count)
+    return updated
+
+class MetadataRecordWriter:
+    """
+    Streams per-file and per-class metadata records to an open text stream
+    as they are extracted; the writer itself keeps none of them.
+    With the 'jsonl' format every record is one line and the aggregated
+    model is the last line. With the 'json' format the records form the
+    'records' array of a single document and the model is its 'model' key.
+    A run that builds no model closes with no model line, or a null 'model'.
+    """
+
+    def __init__(self, stream, output_format, directory):
+        self.stream = stream
+        self.output_format = output_format
+        self.directory = directory
+        self.count = 0
+        if output_format == 'json':
+            self.stream.write('{"records": [\n')
+
+    def write(self, item):
+        if self.output_format == 'jsonl':
+            self.stream.write(json.dumps(item) + '\n')
+        else:
+            self.stream.write((',\n' if self.count else '') + json.dumps(item))
+        self.count += 1
+
+    def write_file_record(self, file_path, record):
+        relative_path = os.path.relpath(file_path, self.directory).replace(os.sep, '/')
+        self.write({
+            "kind": "file",
+            "file": relative_path,
+            "interfaces": record["interfaces"],
+            "base_classes": record["base_classes"],
+            "supported_types": record["supported_types"],
+            "minimum_version": record["minimum_version"],
+            "joins": [join._asdict() for join in record["joins"]]
+        })
+        class_properties = dict(record["class_properties"])
+        class_members = dict(record["class_members"])
+        for class_name, base_classes in record["class_defs"]:
+            self.write({
+                "kind": "class",
+                "file": relative_path,
+                "class": class_name,
+                "bases": base_classes,
+                "properties": [prop._asdict() for prop in class_properties.get(class_name, [])],
+                "members": [member._asdict() for member in class_members.get(class_name, [])]
+            })
+
+    def close(self, model=None):
+        if self.output_format == 'jsonl':
+            if model is not None:
+                self.stream.write(json.dumps(dict(model_to_json(model), kind="model")) + '\n')
+        else:
+            self.stream.write('\n], "model": ' + json.dumps(model_to_json(model) if model is not None else None) + '}\n')
+        self.stream.flush()
+
+def model_to_json(model):
+    """Returns model with its joins and class properties as dicts, as written to JSON."""
+    return dict(
+        model,
+        joins=[join._asdict() for join in model["joins"]],
+        class_properties={
+            class_name: [prop._asdict() for prop in properties]
+            for class_name, properties in model["class_properties"].items()
+        },
+        class_members={
+            class_name: [member._asdict() for member in members]
+            for class_name, members in model["class_members"].items()
+        }
+    )
+
+def model_from_json(model):
+    """Reverses model_to_json for a model loaded from JSON."""
+    return dict(
+        model,
+        joins=[JoinEntry(**join) for join in model["joins"]],
+        class_properties={
+            class_name: [ClassProperty(**prop) for prop in properties]
+            for class_name, properties in model["class_properties"].items()
+        },
+        class_members={
+            class_name: [ClassMember(**member) for member in members]
+            for class_name, members in model["class_members"].items()
+        }
+    )
+
+def write_snapshot(snapshot_path, model):
+    with open(snapshot_path, 'w', encoding='utf-8') as f:
+        json.dump(model_to_json(model), f, indent=4)
+    logging.info("Metadata snapshot written to %s.", snapshot_path)
+
+def load_snapshot(snapshot_path):
+    """
+    Loads a metadata model saved with --snapshot, or the model at the end of
+    a --format json or jsonl export.
+    """
+    with open(snapshot_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    try:
+        model = json.loads(content)
+    except ValueError:
+        # JSON Lines export: the model is the last line
+        model = json.loads(content.rstrip().splitlines()[-1])
+    model = model.get("model", model)
+    if model.get("schema") != MODEL_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported metadata snapshot schema in {snapshot_path}: {model.get('schema')}")
+    return model_from_json(model)
+
+def count_join_errors(model):
+    return sum(1 for issue in model["join_issues"] if issue["severity"] == "error")
+
+def process_project(project_directory, cache=None, jobs=None, since=None, executor=None,
+                    record_writer=None, snapshot_path=None, check=False):
+    """
+    Scans one project and updates the generated sections of its README.md.
+    Records are streamed to the optional record_writer and the aggregated
+    model is saved to snapshot_path when given, even when since finds
+    nothing changed and README.md is skipped. With check, README.md is
+    not written and the status is 'outdated' when it would have been.
+    Returns a report describing what was done.
+    """
+    logging.info("Starting processing in project directory: %s", project_directory)
+    report = {"directory": project_directory, "status": "unchanged"}
+    on_record = record_writer.write_file_record if record_writer is not None else None
+    scan = None
+    if since:
+        if cache is None or not cache.entries or cache.revision is None:
+            logging.warning("--since needs a previous run in the extraction cache. Scanning all files.")
+        else:
+            changed_files = find_changed_source_files(project_directory, [since, cache.revision])
+            if changed_files is not None:
+                # git misses an uncommitted edit the previous run cached and
+                # that was reverted since; the cached mtime and size do not
+                stale = [key for key in cache.stale_keys(project_directory) if not is_ignored_path(key)]
+                changed_files = sorted(set(changed_files).union(stale), key=source_order_key)
+            if changed_files is None:
+                logging.warning("Could not determine changed files. Scanning all files.")
+            elif not changed_files:
+                logging.info("No C# files changed since %s. README.md left untouched.", since)
+                report["status"] = "skipped"
+                if record_writer is None and not snapshot_path:
+                    return report
+                # The requested exports are still written, from the cached records
+                scan = scan_changed_files(project_directory, cache, [], jobs, executor, on_record)
+            else:
+                scan = scan_changed_files(project_directory, cache, changed_files, jobs, executor, on_record)
+    if scan is None:
+        scan = scan_directory(project_directory, cache, jobs, executor, on_record)
+    if cache is not None:
+        # The revision marks what README.md was last rendered from; a check
+        # renders nothing, so it keeps the previous one for the next --since
+        cache.save(cache.revision if check else git_revision(project_directory))
+    if scan["timed_out"]:
+        logging.warning("%s files exceeded the %ss extraction time budget and were skipped: %s",
+                        len(scan["timed_out"]), FILE_TIME_BUDGET, ", ".join(scan["timed_out"]))
+        report["timed_out"] = scan["timed_out"]
+
+    model = build_metadata_model(scan)
+    if record_writer is not None:
+        record_writer.close(model)
+    if snapshot_path:
+        write_snapshot(snapshot_path, model)
+
+    if report["status"] != "skipped" and update_readme(project_directory, model, check):
+        report["status"] = "outdated" if check else "updated"
+    report.update({
+        "files": model["file_count"],
+        "interfaces": len(remove_duplicates_preserve_order(model["interfaces"])),
+        "supported_types": len(model["supported_types"]),
+        "public_methods": count_public_methods(model),
+        "feedbacks": sum(len(names) for names in model["feedbacks"].values()),
+        "joins": len(model["joins"]),
+        "join_errors": count_join_errors(model)
+    })
+    return report
+
+def snapshot_source_files(directory):
+    """Returns {file_path: (mtime_ns, size)} for the project's C# files, in walk order."""
+    snapshot = {}
+    for file_path in find_source_files(directory):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+class InotifyWaiter:
+    """
+    Blocks until something changes under the watched directories, using
+    Linux inotify through ctypes. Events only wake the watcher up; what
+    changed is found by comparing snapshots.
+    """
+
+    # IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    MASK = 0x002 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+
+    def __init__(self, libc, fd):
+        self.libc = libc
+        self.fd = fd
+
+    @classmethod
+    def create(cls):
+        """Returns an InotifyWaiter, or None where inotify is not available."""
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            logging.debug("inotify unavailable: %s", e)
+            return None
+        return cls(libc, fd) if fd >= 0 else None
+
+    def watch(self, directories):
+        # Adding a watch that already exists only updates it, so the whole
+        # tree can be passed again to pick up new directories
+        for directory in directories:
+            self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+
+    def wait(self, timeout=None):
+        """Waits up to timeout seconds (forever for None); returns True if anything changed."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+def watch_project(project_directory, cache=None, jobs=None, snapshot_path=None):
+    """
+    Scans the project once, then keeps its per-file records in memory and
+    re-renders README.md whenever C# files change, re-extracting only the
+    changed files. Changes are picked up through inotify where available and
+    by polling every WATCH_POLL_INTERVAL seconds otherwise; a burst of saves
+    is handled once the tree has been quiet for WATCH_DEBOUNCE seconds.
+    Runs until interrupted.
+    """
+    def render(file_paths, timed_out=()):
+        scan = merge_file_records(file_paths, [records.get(file_path) for file_path in file_paths],
+                                  timed_out=timed_out)
+        model = build_metadata_model(scan)
+        if snapshot_path:
+            write_snapshot(snapshot_path, model)
+        return update_readme(project_directory, model)
+
+    snapshot = snapshot_source_files(project_directory)
+    file_paths = list(snapshot)
+    records = dict(zip(file_paths, load_file_records(project_directory, file_paths, cache, jobs)))
+    render(file_paths)
+
+    waiter = InotifyWaiter.create()
+    logging.info("Watching %s for changes (%s). Press Ctrl+C to stop.",
+                 project_directory, "inotify" if waiter else f"polling every {WATCH_POLL_INTERVAL}s")
+    try:
+        while True:
+            if waiter is not None:
+                waiter.watch(root for root, _, _, _ in walk_project(project_directory))
+                waiter.wait()
+            else:
+                sleep(WATCH_POLL_INTERVAL)
+            current = snapshot_source_files(project_directory)
+            if current == snapshot:
+                continue
+            # Let a burst of saves settle before re-rendering
+            while True:
+                sleep(WATCH_DEBOUNCE)
+                settled = snapshot_source_files(project_directory)
+                if settled == current:
+                    break
+                current = settled
+
+            start = perf_counter()
+            changed = [file_path for file_path, stat in current.items() if snapshot.get(file_path) != stat]
+            removed = snapshot.keys() - current.keys()
+            for file_path in removed:
+                records.pop(file_path, None)
+            timed_out = []
+            records.update(zip(changed, load_file_records(project_directory, changed, cache, jobs, timed_out=timed_out)))
+            snapshot = current
+            updated = render(list(current), timed_out)
+            logging.info("%s files re-extracted and %s removed in %.1f ms; README.md %s.", len(changed), len(removed),
+                         (perf_counter() - start) * 1000, "updated" if updated else "unchanged")
+    except KeyboardInterrupt:
+        logging.info("Stopped watching %s.", project_directory)
+    finally:
+        if waiter is not None:
+            waiter.close()
+        if cache is not None:
+            cache.save(git_revision(project_directory))
+
+def default_cache_dir():
+    """
+    Returns the user cache directory the extraction cache goes to without
+    --cache-dir: $XDG_CACHE_HOME/essentials-metadata, or
+    ~/.cache/essentials-metadata. It is outside the project, so scanning a
+    plugin never leaves untracked files in its working tree.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "essentials-metadata")
+
+def open_cache(project_directory, cache_dir=None, shared_records=None):
+    """
+    Opens the extraction cache for a project. The cache_dir, or the
+    default_cache_dir() shared by every project, holds a file per project.
+    """
+    digest = hashlib.sha1(project_directory.encode('utf-8')).hexdigest()[:12]
+    filename = f"{os.path.basename(project_directory)}-{digest}-{CACHE_FILENAME}"
+    cache_path = os.path.join(cache_dir or default_cache_dir(), filename)
+    return ExtractionCache(cache_path, shared_records).load()
+
+def read_manifest(manifest_path):
+    """
+    Reads a batch manifest: a JSON list of directories or one directory per
+    line, with blank lines and '#' comments ignored. Relative directories
+    are resolved against the manifest's location.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if content.lstrip().startswith('['):
+        directories = json.loads(content)
+    else:
+        directories = [line.strip() for line in content.splitlines()]
+        directories = [line for line in directories if line and not line.startswith('#')]
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    return [os.path.join(base, directory) for directory in directories]
+
+def run_batch(directories, cache_dir=None, use_cache=True, jobs=None, workers=None, since=None, check=False):
+    """
+    Processes several projects concurrently in one process. Projects are
+    handled by a bounded thread pool and share one extraction process pool,
+    so compiled patterns live on in the workers, and one content-hash index
+    of cached records.
+    Returns the combined report.
+    """
+    directories = [os.path.abspath(directory) for directory in dict.fromkeys(directories)]
+    job_count = jobs or os.cpu_count() or 1
+    workers = workers or min(len(directories), job_count) or 1
+    shared_records = {}
+    logging.info("Processing %s projects with %s workers and %s extraction processes.",
+                 len(directories), workers, job_count)
+
+    def process(directory):
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"Not a project directory: {directory}")
+        cache = open_cache(directory, cache_dir, shared_records) if use_cache else None
+        return process_project(directory, cache, job_count, since, executor, check=check)
+
+    reports = []
+    with create_extraction_pool(job_count) as executor, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=workers) as threads:
+        futures = {threads.submit(process, directory): directory for directory in directories}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                logging.error("Error processing project %s: %s", futures[future], e)
+                reports.append({"directory": futures[future], "status": "error", "error": str(e)})
+    reports.sort(key=lambda report: directories.index(report["directory"]))
+    return {
+        "projects": reports,
+        "updated": sum(1 for report in reports if report["status"] == "updated"),
+        "outdated": sum(1 for report in reports if report["status"] == "outdated"),
+        "errors": sum(1 for report in reports if report["status"] == "error"),
+        "join_errors": sum(report.get("join_errors", 0) for report in reports)
+    }
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Update README.md sections from Essentials plugin source metadata.")
+    parser.add_argument("directory", nargs="?", default="./",
+                        help="Project directory to scan (default: current directory).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-extract every file and do not read or write the extraction cache.")
+    parser.add_argument("--cache-dir",
+                        help="Directory holding an extraction cache file per project "
+                             "(default: $METADATA_CACHE_DIR, or "
+                             "$XDG_CACHE_HOME/essentials-metadata or ~/.cache/essentials-metadata).")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="Number of extraction processes; 0 selects automatically from the file count (default: 0).")
+    parser.add_argument("--since", metavar="REF",
+                        help="Only re-extract C# files that git reports as changed since REF (or since the "
+                             "revision of the previous run) and reuse cached results for the rest. "
+                             "Leaves README.md untouched when no C# file changed; --snapshot and --format "
+                             "are still written from the cached results.")
+    parser.add_argument("--batch", nargs="+", metavar="DIRECTORY",
+                        help="Process several project directories in one run instead of a single directory.")
+    parser.add_argument("--manifest",
+                        help="Batch mode: file listing project directories (JSON list or one per line).")
+    parser.add_argument("--batch-workers", type=int, default=0,
+                        help="Batch mode: number of projects processed at once (default: one per CPU).")
+    parser.add_argument("--report",
+                        help="Batch mode: write the combined JSON report to this file instead of stdout.")
+    parser.add_argument("--format", choices=["json", "jsonl"],
+                        help="Also stream per-file and per-class metadata records, followed by the aggregated "
+                             "model, in this format.")
+    parser.add_argument("--output", default="-",
+                        help="File to write --format records to (default: stdout).")
+    parser.add_argument("--snapshot",
+                        help="Save the aggregated metadata model to this JSON file.")
+    parser.add_argument("--from-snapshot",
+                        help="Render README.md from a saved snapshot or export instead of parsing the sources.")
+    parser.add_argument("--ignore", action="append", default=[], metavar="GLOB",
+                        help="Skip directories and files whose name or project-relative path matches GLOB, "
+                             f"in addition to {', '.join(IGNORE_GLOBS)}. May be repeated.")
+    parser.add_argument("--io-threads", type=int, default=IO_THREADS, metavar="N",
+                        help=f"Threads reading and hashing files ahead of extraction, for slow or network "
+                             f"storage (default: {IO_THREADS}, 0 reads inline).")
+    parser.add_argument("--file-time-budget", type=float, default=FILE_TIME_BUDGET, metavar="SECONDS",
+                        help="Skip, with a warning, any file whose extraction takes longer than this "
+                             f"(default: {FILE_TIME_BUDGET:g}, 0 disables the limit).")
+    parser.add_argument("--sample-max-depth", type=int, default=SAMPLE_MAX_DEPTH, metavar="N",
+                        help=f"Nested config classes expanded in the Config Example (default: {SAMPLE_MAX_DEPTH}).")
+    parser.add_argument("--sample-max-values", type=int, default=SAMPLE_MAX_VALUES, metavar="N",
+                        help=f"Values generated for the Config Example before it is cut (default: {SAMPLE_MAX_VALUES}).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record wall/CPU time and call counts per phase and extractor and print a summary, "
+                             "also appended to $GITHUB_STEP_SUMMARY when set.")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile, also trace the peak memory allocated while reading and "
+                             "extracting each file (slower).")
+    parser.add_argument("--profile-output",
+                        help="With --profile, also dump cProfile statistics to this pstats file.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running after the first update and re-render README.md whenever C# files change.")
+    parser.add_argument("--check", action="store_true",
+                        help="Do not write README.md; only report whether it would change, exiting with status 1 "
+                             "if it would and 0 if it is up to date.")
+    parser.add_argument("--strict", action="store_true",
+                        help="Exit with an error when join map validation finds incomplete, duplicate, "
+                             "overlapping or hidden joins. README.md is still updated.")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help=f"Logging level (default: ${LOG_LEVEL_ENV} or {DEFAULT_LOG_LEVEL}).")
+    args = parser.parse_args(argv)
+    if (args.batch or args.manifest) and (args.format or args.snapshot or args.from_snapshot):
+        parser.error("--format, --snapshot and --from-snapshot apply to a single project, not to batch mode.")
+    if args.watch and (args.batch or args.manifest or args.from_snapshot or args.format or args.check):
+        parser.error("--watch applies to a single scanned project and cannot be combined with "
+                     "--batch, --manifest, --from-snapshot, --format or --check.")
+    return args
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    configure_logging(args.log_level)
+
+    FILE_TIME_BUDGET = args.file_time_budget
+    IO_THREADS = args.io_threads
+    IGNORE_GLOBS = IGNORE_GLOBS + args.ignore
+    SAMPLE_MAX_DEPTH = args.sample_max_depth
+    SAMPLE_MAX_VALUES = args.sample_max_values
+    profiler = None
+    if args.profile:
+        PROFILER = Profiler(trace_memory=args.profile_memory)
+        if args.profile_output:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+    def finish_profile():
+        if PROFILER is None:
+            return
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_output)
+            logging.info("cProfile statistics written to %s.", args.profile_output)
+        summary = PROFILER.format_summary()
+        print(summary, file=sys.stderr)
+        step_summary = os.environ.get("GITHUB_STEP_SUMMARY")
+        if step_summary:
+            with open(step_summary, 'a', encoding='utf-8') as f:
+                f.write(summary)
+
+    def exit_on_join_errors(join_errors):
+        if args.strict and join_errors:
+            logging.error("--strict: join map validation found %s errors.", join_errors)
+            sys.exit(1)
+
+    if args.from_snapshot:
+        model = load_snapshot(args.from_snapshot)
+        outdated = update_readme(os.path.abspath(args.directory), model, args.check)
+        finish_profile()
+        exit_on_join_errors(count_join_errors(model))
+        logging.info("Processing completed.")
+        sys.exit(1 if args.check and outdated else 0)
+
+    if args.batch or args.manifest:
+        directories = list(args.batch or [])
+        if args.manifest:
+            directories.extend(read_manifest(args.manifest))
+        cache_dir = args.cache_dir or os.environ.get("METADATA_CACHE_DIR")
+        batch_report = run_batch(directories, cache_dir, not args.no_cache, args.jobs, args.batch_workers, args.since,
+                                 args.check)
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(batch_report, f, indent=4)
+        else:
+            print(json.dumps(batch_report, indent=4))
+        logging.info("Batch completed: %s projects, %s updated, %s outdated, %s errors.",
+                     len(batch_report["projects"]), batch_report["updated"], batch_report["outdated"],
+                     batch_report["errors"])
+        finish_profile()
+        exit_on_join_errors(batch_report["join_errors"])
+        sys.exit(1 if batch_report["errors"] or batch_report["outdated"] else 0)
+
+    project_directory = os.path.abspath(args.directory)
+    cache = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or os.environ.get("METADATA_CACHE_DIR")
+        cache = open_cache(project_directory, cache_dir)
+
+    if args.watch:
+        watch_project(project_directory, cache, args.jobs, args.snapshot)
+        sys.exit(0)
 
-    logging.info("Processing completed.")
\ No newline at end of file
+    record_writer = None
+    if args.format:
+        output = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+        record_writer = MetadataRecordWriter(output, args.format, project_directory)
+    try:
+        report = process_project(project_directory, cache, args.jobs, args.since,
+                                 record_writer=record_writer, snapshot_path=args.snapshot, check=args.check)
+    finally:
+        if record_writer is not None and record_writer.stream is not sys.stdout:
+            record_writer.stream.close()
+    finish_profile()
+    exit_on_join_errors(report.get("join_errors", 0))
+    logging.info("Processing completed.")
+    if args.check and report["status"] == "outdated":
+        sys.exit(1)
@@ -0,0 +1,14 @@
+import benchmark
+
+def phases(**seconds):
+    return {"corpus": {}, "phases": {phase: {"seconds": value} for phase, value in seconds.items()}}
+
+def test_small_phases_need_an_absolute_slowdown():
+    baseline = phases(readme_splice=0.001, extraction=1.0)
+    result = phases(readme_splice=0.003, extraction=1.2)
+    assert benchmark.compare_with_baseline(result, baseline, 0.25) == []
+
+def test_slowdown_past_both_limits_is_a_regression():
+    baseline = phases(readme_splice=0.001, extraction=1.0)
+    result = phases(readme_splice=0.010, extraction=1.5)
+    assert benchmark.compare_with_baseline(result, baseline, 0.25) == ["readme_splice", "extraction"]
@@ -0,0 +1,96 @@
+import time
+
+import metadata
+
+def commented_class(commented_lines):
+    """A class whose body is mostly a commented-out block, with live members after it."""
+    body = "".join(f"        // public int Old{line} {{ get; set; }}\n" for line in range(commented_lines))
+    return (
+        "namespace Plugin\n"
+        "{\n"
+        "    [Description(\"device\")]\n"
+        "    public class Device : EssentialsDevice\n"
+        "    {\n"
+        "        /*\n" + body + "        */\n" + body +
+        "        [JsonProperty(\"name\")]\n"
+        "        public string Name { get; set; }\n"
+        "        public void Run() { }\n"
+        "        public BoolFeedback Ready { get; private set; }\n"
+        "    }\n"
+        "}\n"
+    )
+
+def test_long_commented_block_is_extracted_quickly():
+    content = commented_class(1000)
+    start = time.perf_counter()
+    record = metadata.extract_file_metadata(content)
+    # Anchoring with ^\s* rescanned the blanked comments from every line: ~14 s
+    assert time.perf_counter() - start < 1.0
+    assert record["class_defs"] == [("Device", ["EssentialsDevice"])]
+    assert record["class_properties"] == [("Device", [metadata.ClassProperty("name", "Name", "string"),
+                                                      metadata.ClassProperty("Ready", "Ready", "BoolFeedback")])]
+    members = dict(record["class_members"])["Device"]
+    assert [(member.kind, member.name) for member in members] == [
+        ("property", "Name"), ("method", "Run"), ("feedback", "Ready")
+    ]
+
+def test_attributes_on_their_own_line():
+    content = (
+        "[Serializable]\n"
+        "[Obsolete(\"old\")] public sealed class Config\n"
+        "{\n"
+        "    [JsonProperty(\"host\")]\n"
+        "\n"
+        "    public string Host { get; set; }\n"
+        "}\n"
+    )
+    assert metadata.extract_class_definitions(content) == [("Config", [])]
+    assert metadata.extract_class_properties(content) == [("Config", [metadata.ClassProperty("host", "Host", "string")])]
+
+def extraction_seconds(content):
+    # The fastest of a few runs is the least disturbed by other load
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        metadata.extract_file_metadata(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def test_comment_heavy_extraction_is_linear():
+    small = extraction_seconds(commented_class(1000))
+    large = extraction_seconds(commented_class(8000))
+    # Eight times the comments: about 8x when linear, 64x when quadratic
+    assert large < small * 20
+
+def test_comment_heavy_file_stays_within_time_budget():
+    record = metadata.extract_file_metadata(commented_class(4000), time_budget=metadata.FILE_TIME_BUDGET)
+    members = dict(record["class_members"])["Device"]
+    assert [member.name for member in members] == ["Name", "Run", "Ready"]
+
+def test_members_after_a_literal_holding_a_parenthesis():
+    content = (
+        "public class Display\n"
+        "{\n"
+        "    public void Send(string text = \")\", char open = '(') { }\n"
+        "    [Description(\"(see manual\")]\n"
+        "    public int Input(int number) { return number; }\n"
+        "    public BoolFeedback PowerIsOn { get; private set; }\n"
+        "}\n"
+    )
+    members = dict(metadata.extract_class_members(content))["Display"]
+    assert [member.signature for member in members] == [
+        "public void Send(string text = \")\", char open = '(')",
+        "public int Input(int number)",
+        "public BoolFeedback PowerIsOn",
+    ]
+
+def test_unbalanced_parameters_skip_only_that_member():
+    content = (
+        "public class Display\n"
+        "{\n"
+        "    public void Broken(int a;\n"
+        "    public void Run() { }\n"
+        "}\n"
+    )
+    members = dict(metadata.extract_class_members(content))["Display"]
+    assert [member.name for member in members] == ["Run"]
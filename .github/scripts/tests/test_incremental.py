@@ -0,0 +1,103 @@
+import subprocess
+import sys
+
+import metadata
+
+DEVICE = (
+    "namespace Plugin\n"
+    "{\n"
+    "    public class Device\n"
+    "    {\n"
+    "        public void METHOD() { }\n"
+    "    }\n"
+    "}\n"
+)
+
+def git(directory, *args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   cwd=directory, check=True, capture_output=True)
+
+def write_device(directory, method):
+    (directory / "Device.cs").write_text(DEVICE.replace("METHOD", method), encoding="utf-8")
+
+def make_repository(tmp_path):
+    project = tmp_path / "plugin"
+    project.mkdir()
+    git(project, "init", "-q")
+    write_device(project, "PowerOn")
+    git(project, "add", "-A")
+    git(project, "commit", "-q", "-m", "initial")
+    return project
+
+def run(project, cache_dir, since=None, check=False):
+    cache = metadata.open_cache(str(project), str(cache_dir))
+    return metadata.process_project(str(project), cache, jobs=1, since=since, check=check)
+
+def readme(project):
+    return (project / "README.md").read_text(encoding="utf-8")
+
+def test_check_does_not_hide_changes_from_since(tmp_path):
+    project = make_repository(tmp_path)
+    cache_dir = tmp_path / "cache"
+    assert run(project, cache_dir)["status"] == "updated"
+    write_device(project, "Reboot")
+    git(project, "commit", "-q", "-am", "rename method")
+
+    assert run(project, cache_dir, since="HEAD", check=True)["status"] == "outdated"
+    # The update step after a check must still see the commit as changed
+    assert run(project, cache_dir, since="HEAD")["status"] == "updated"
+    assert "public void Reboot()" in readme(project)
+
+def test_first_run_check_then_since_scans_everything(tmp_path):
+    project = make_repository(tmp_path)
+    cache_dir = tmp_path / "cache"
+    assert run(project, cache_dir, since="HEAD", check=True)["status"] == "outdated"
+    # The check left records but no rendered revision, so nothing may be skipped
+    assert run(project, cache_dir, since="HEAD")["status"] == "updated"
+    assert "public void PowerOn()" in readme(project)
+
+def test_reverted_edit_is_not_served_from_cache(tmp_path):
+    project = make_repository(tmp_path)
+    cache_dir = tmp_path / "cache"
+    run(project, cache_dir)
+    write_device(project, "Reboot")
+    run(project, cache_dir, since="HEAD")
+    assert "public void Reboot()" in readme(project)
+
+    # git now sees no change, but the cache still holds the uncommitted edit
+    git(project, "checkout", "--", "Device.cs")
+    assert run(project, cache_dir, since="HEAD")["status"] == "updated"
+    assert "public void PowerOn()" in readme(project)
+    assert "Reboot" not in readme(project)
+
+def test_renamed_file_is_counted_once(tmp_path):
+    project = make_repository(tmp_path)
+    cache_dir = tmp_path / "cache"
+    (project / "Other.cs").write_text("namespace Plugin { }\n", encoding="utf-8")
+    git(project, "add", "-A")
+    git(project, "commit", "-q", "-m", "other")
+    run(project, cache_dir)
+    git(project, "mv", "Other.cs", "Moved.cs")
+    git(project, "commit", "-q", "-m", "move")
+    assert run(project, cache_dir, since="HEAD~1")["files"] == 2
+
+def test_single_runs_keep_a_cache_file_per_project(tmp_path):
+    cache_dir = tmp_path / "cache"
+    for name in ("first", "second"):
+        project = tmp_path / name / "plugin"
+        project.mkdir(parents=True)
+        write_device(project, "PowerOn")
+        subprocess.run([sys.executable, metadata.__file__, str(project), "--cache-dir", str(cache_dir)],
+                       check=True, capture_output=True)
+    # Same basename, different projects: neither may overwrite the other's records
+    assert len(list(cache_dir.iterdir())) == 2
+
+def test_skipped_run_still_writes_the_snapshot(tmp_path):
+    project = make_repository(tmp_path)
+    cache_dir = tmp_path / "cache"
+    run(project, cache_dir)
+    snapshot = tmp_path / "model.json"
+    cache = metadata.open_cache(str(project), str(cache_dir))
+    report = metadata.process_project(str(project), cache, jobs=1, since="HEAD", snapshot_path=str(snapshot))
+    assert report["status"] == "skipped"
+    assert metadata.load_snapshot(str(snapshot))["file_count"] == 1
@@ -0,0 +1,46 @@
+import metadata
+
+def join(name, number, join_type="Digital"):
+    return (
+        f"        [JoinName(\"{name}\")]\n"
+        f"        public JoinDataComplete {name} = new JoinDataComplete(\n"
+        f"            new JoinData {{ JoinNumber = {number}, JoinSpan = 1 }},\n"
+        f"            new JoinMetadata {{ Description = \"{name}\", JoinCapabilities = eJoinCapabilities.ToSIMPL, "
+        f"JoinType = eJoinType.{join_type} }});\n"
+    )
+
+def joinmap(class_name, *joins):
+    return (
+        f"    public class {class_name} : JoinMapBaseAdvanced\n"
+        "    {\n" + "".join(joins) + "    }\n"
+    )
+
+def write(path, *classes):
+    path.write_text("namespace Plugin\n{\n" + "".join(classes) + "}\n", encoding="utf-8")
+
+def collect(directory):
+    return metadata.collect_joinmap_info(metadata.scan_directory(str(directory)))
+
+def test_file_with_two_join_maps_gives_each_its_own_joins(tmp_path):
+    write(tmp_path / "JoinMaps.cs", joinmap("DisplayJoinMap", join("Power", 1)), joinmap("AudioJoinMap", join("Mute", 1)))
+    joins = collect(tmp_path)
+    assert sorted((entry.class_name, entry.name) for entry in joins) == [
+        ("AudioJoinMap", "Mute"), ("DisplayJoinMap", "Power")
+    ]
+
+def test_join_map_found_by_declaring_file_over_file_name(tmp_path):
+    # The file named after the class holds another map; the class lives elsewhere
+    write(tmp_path / "DisplayJoinMap.cs", joinmap("OtherJoinMap", join("Other", 5)))
+    write(tmp_path / "Maps.cs", joinmap("DisplayJoinMap", join("Power", 1)))
+    joins = collect(tmp_path)
+    assert sorted((entry.class_name, entry.name) for entry in joins) == [
+        ("DisplayJoinMap", "Power"), ("OtherJoinMap", "Other")
+    ]
+
+def test_communication_layout_is_valid(tmp_path):
+    directions = [("Connect", "Digital", "FromSIMPL"), ("Connected", "Digital", "ToSIMPL"),
+                  ("SendText", "Serial", "FromSIMPL"), ("TextReceived", "Serial", "ToSIMPL")]
+    joins = [join(name, 1, join_type).replace("ToSIMPL", capabilities) for name, join_type, capabilities in directions]
+    write(tmp_path / "CommJoinMap.cs", joinmap("CommJoinMap", *joins))
+    scan = metadata.scan_directory(str(tmp_path))
+    assert [issue for issue in metadata.validate_join_maps(scan) if issue["severity"] == "error"] == []
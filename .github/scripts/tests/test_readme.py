@@ -0,0 +1,51 @@
+import random
+import re
+
+import metadata
+
+TITLES = ["Config Example", "Supported Types", "Join Maps", "Public Methods"]
+
+def reference_update_section(readme_content, section_title, new_section_content):
+    """The one-section update the single-pass splice replaced."""
+    start_marker = f'<!-- START {section_title} -->'
+    end_marker = f'<!-- END {section_title} -->'
+    match = re.search(rf'{re.escape(start_marker)}(.*?){re.escape(end_marker)}', readme_content,
+                      re.DOTALL | re.IGNORECASE)
+    if match:
+        if '<!-- SKIP -->' in match.group(1):
+            return readme_content
+        updated_section = f'{start_marker}\n{new_section_content.rstrip()}\n{end_marker}'
+        return readme_content[:match.start()] + updated_section + readme_content[match.end():]
+    if not readme_content.endswith('\n'):
+        readme_content += '\n'
+    return readme_content + f'{start_marker}\n{new_section_content.rstrip()}\n{end_marker}\n'
+
+def random_readme(generator):
+    pieces = ["# Plugin\n"]
+    for title in generator.sample(TITLES, generator.randint(0, len(TITLES))):
+        body = generator.choice(["", "old\n", "<!-- SKIP -->\nkept\n"])
+        pieces.append(f"Text {generator.random()}\n<!-- START {title} -->\n{body}<!-- END {title} -->\n")
+    if generator.random() < 0.5:
+        pieces.append("trailing text")
+    return "".join(pieces)
+
+def test_splice_matches_sequential_updates():
+    generator = random.Random(0)
+    for _ in range(500):
+        readme = random_readme(generator)
+        sections = [(title, f"### {title}\n\n- {generator.random()}\n") for title in TITLES]
+        expected = readme
+        for section_title, content in sections:
+            expected = reference_update_section(expected, section_title, content)
+        assert metadata.splice_readme_sections(readme, sections) == expected
+
+def test_start_marker_without_end_leaves_readme_untouched(caplog):
+    readme = "# Plugin\n<!-- START Join Maps -->\nold joins\n\n## Usage\n"
+    sections = [("Join Maps", "### Join Maps\n"), ("Supported Types", "### Supported Types\n")]
+    assert metadata.splice_readme_sections(readme, sections) == readme
+    assert "without an END marker for: Join Maps" in caplog.text
+
+def test_unchanged_content_keeps_an_outdated_marker():
+    readme = "<!-- START Supported Types sha256:0000000000000000 -->\n- a\n<!-- END Supported Types -->\n"
+    sections = [("Supported Types", lambda: "- a\n", "1111111111111111")]
+    assert metadata.splice_readme_sections(readme, sections) == readme